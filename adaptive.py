@@ -0,0 +1,117 @@
+"""Adaptive question selection.
+
+The player has an Elo-style ability rating that is updated in constant time
+after every answer; each difficulty bucket has a fixed rating. The next
+adventure question comes from the bucket whose rating is closest to the one
+the player is expected to answer correctly TARGET_SUCCESS of the time, found
+by bisecting the rating-sorted buckets, and is drawn at random from the
+chapter's posting list for that bucket. No answer history is scanned.
+
+The model's state is a plain dict so it can be stored as JSON next to
+scores.json (see storage.JsonStore).
+"""
+import math
+from bisect import bisect_left
+
+from question_bank import DIFFICULTIES
+
+DIFFICULTY_RATING = {"easy": 1000.0, "medium": 1200.0, "hard": 1400.0}
+# buckets sorted by rating, for bisect
+_BUCKETS = sorted((rating, d) for d, rating in DIFFICULTY_RATING.items())
+_RATINGS = [rating for rating, _d in _BUCKETS]
+
+TARGET_SUCCESS = 0.7
+K_START = 64.0
+K_MIN = 16.0
+
+
+def default_model():
+    return {
+        "version": 1,
+        "rating": 1200.0,
+        "answered": 0,
+        "by_difficulty": {d: [0, 0] for d in DIFFICULTIES},   # [answered, correct]
+    }
+
+
+def expected_success(ability, rating):
+    return 1.0 / (1.0 + 10.0 ** ((rating - ability) / 400.0))
+
+
+class PlayerModel:
+    def __init__(self, data=None):
+        self.data = data if data is not None else default_model()
+
+    @property
+    def rating(self):
+        return self.data["rating"]
+
+    def update(self, difficulty, correct):
+        data = self.data
+        rating = DIFFICULTY_RATING.get(difficulty, DIFFICULTY_RATING["medium"])
+        # big steps while the estimate is new, settling as answers come in
+        k = max(K_MIN, K_START / (1.0 + data["answered"] / 20.0))
+        data["rating"] += k * ((1.0 if correct else 0.0) - expected_success(data["rating"], rating))
+        data["answered"] += 1
+        if difficulty in DIFFICULTIES:
+            bucket = data["by_difficulty"].setdefault(difficulty, [0, 0])
+            bucket[0] += 1
+            bucket[1] += 1 if correct else 0
+
+    def target_rating(self):
+        # question rating the player answers correctly TARGET_SUCCESS of the time
+        return self.rating + 400.0 * math.log10((1.0 - TARGET_SUCCESS) / TARGET_SUCCESS)
+
+    def preferred_difficulties(self):
+        """Difficulty buckets nearest the target rating first."""
+        target = self.target_rating()
+        hi = bisect_left(_RATINGS, target)
+        lo = hi - 1
+        order = []
+        while lo >= 0 or hi < len(_BUCKETS):
+            if hi >= len(_BUCKETS) or (lo >= 0 and target - _RATINGS[lo] <= _RATINGS[hi] - target):
+                order.append(_BUCKETS[lo][1])
+                lo -= 1
+            else:
+                order.append(_BUCKETS[hi][1])
+                hi += 1
+        return order
+
+
+class AdaptiveSelector:
+    def __init__(self, index, player, rng):
+        self.index = index
+        self.player = player
+        self.rng = rng
+        self._used = {}     # chapter -> positions already picked this run
+
+    def reset(self):
+        self._used = {}
+
+    def _draw(self, postings, used):
+        # rejection sampling: expected O(1) while the bucket is mostly unused
+        n = len(postings)
+        if n <= len(used):
+            free = [pos for pos in postings if pos not in used]
+            return self.rng.choice(free) if free else None
+        for _ in range(8):
+            pos = postings[self.rng.randrange(n)]
+            if pos not in used:
+                return pos
+        free = [pos for pos in postings if pos not in used]
+        return self.rng.choice(free) if free else None
+
+    def pick(self, chapter):
+        """Local index of the next question for `chapter`."""
+        used = self._used.setdefault(chapter, set())
+        for difficulty in self.player.preferred_difficulties():
+            pos = self._draw(self.index.postings(chapter=chapter, difficulty=difficulty), used)
+            if pos is not None:
+                break
+        else:
+            # questions without a difficulty, or the chapter ran dry
+            pos = self._draw(self.index.postings(chapter=chapter), used)
+            if pos is None:
+                return None
+        used.add(pos)
+        return self.index.local[pos]
@@ -0,0 +1,204 @@
+"""Background image preloading and decoded-texture cache.
+
+Chapter backgrounds are multi-megabyte JPEGs. Decoding them on the UI thread
+at a chapter switch stalls the frame, so the next chapter's background is
+decoded on a worker thread while the current one is played, and uploaded to
+the GPU in a later frame. Textures are kept in an LRU bounded by bytes.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from queue import Queue
+
+from kivy.clock import mainthread
+from kivy.core.image import ImageLoader
+from kivy.logger import Logger
+
+
+def _decode(path):
+    # same call kivy.loader.Loader makes from its worker threads
+    return ImageLoader.load(path, keep_data=False, nocache=True)
+
+
+def texture_bytes(texture):
+    return texture.width * texture.height * 4
+
+
+class BackgroundCache:
+    def __init__(self, budget_bytes=48 * 1024 * 1024, prepare=None):
+        self.budget_bytes = budget_bytes
+        # prepare(path) runs before a file is read, on the worker for preloads
+        self.prepare = prepare
+        self._textures = OrderedDict()   # path -> (texture, nbytes)
+        self._pending = set()
+        self._callbacks = {}             # path -> [callback(texture)]
+        self._queue = Queue()
+        self._worker = None
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.preloaded = 0
+        self.evictions = 0
+        self.sync_decode_ms = 0.0
+        self.async_decode_ms = 0.0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "preloaded": self.preloaded,
+            "evictions": self.evictions,
+            "entries": len(self._textures),
+            "bytes_used": self.bytes_used,
+            "budget_bytes": self.budget_bytes,
+            "sync_decode_ms": round(self.sync_decode_ms, 2),
+            "async_decode_ms": round(self.async_decode_ms, 2),
+        }
+
+    def get(self, path):
+        """Return the texture for `path`, decoding it synchronously on a miss."""
+        if not path:
+            return None
+        entry = self._textures.get(path)
+        if entry is not None:
+            self._textures.move_to_end(path)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if self.prepare is not None:
+            self.prepare(path)
+        if not os.path.exists(path):
+            return None
+        start = time.perf_counter()
+        try:
+            texture = _decode(path).texture
+        except Exception as e:
+            Logger.warning(f"Assets: could not load {path}: {e}")
+            return None
+        self.sync_decode_ms += (time.perf_counter() - start) * 1000.0
+        self._put(path, texture)
+        return texture
+
+    def preload(self, path, callback=None):
+        """Decode `path` in the background so a later get() is a hit.
+
+        `callback(texture)` runs on the main thread once the texture is
+        ready, right away if it is cached already; the texture is None if
+        the image could not be loaded.
+        """
+        if not path:
+            return
+        entry = self._textures.get(path)
+        if entry is not None:
+            if callback is not None:
+                callback(entry[0])
+            return
+        if callback is not None:
+            self._callbacks.setdefault(path, []).append(callback)
+        if path in self._pending:
+            return
+        self._pending.add(path)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="bg-preload", daemon=True)
+            self._worker.start()
+        self._queue.put(path)
+
+    def clear(self):
+        self._textures.clear()
+        self.bytes_used = 0
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            start = time.perf_counter()
+            image = None
+            try:
+                if self.prepare is not None:
+                    self.prepare(path)
+                if os.path.exists(path):
+                    image = _decode(path)
+            except Exception as e:
+                Logger.warning(f"Assets: could not preload {path}: {e}")
+            self._finish(path, image, (time.perf_counter() - start) * 1000.0)
+
+    @mainthread
+    def _finish(self, path, image, decode_ms):
+        self._pending.discard(path)
+        callbacks = self._callbacks.pop(path, ())
+        entry = self._textures.get(path)
+        if entry is not None:
+            texture = entry[0]
+        elif image is not None:
+            # texture creation/upload has to happen on the GL thread
+            texture = image.texture
+            if texture is not None:
+                self.async_decode_ms += decode_ms
+                self.preloaded += 1
+                self._put(path, texture)
+        else:
+            texture = None
+        for callback in callbacks:
+            callback(texture)
+
+    def _put(self, path, texture):
+        nbytes = texture_bytes(texture)
+        self._textures[path] = (texture, nbytes)
+        self.bytes_used += nbytes
+        # evict least recently used, but always keep the newest entry
+        while self.bytes_used > self.budget_bytes and len(self._textures) > 1:
+            _old, (_tex, old_bytes) = self._textures.popitem(last=False)
+            self.bytes_used -= old_bytes
+            self.evictions += 1
+
+
+class VariantResolver:
+    """Maps a background to the smallest pre-scaled variant covering a size.
+
+    Variants and their manifest are produced offline by tools/build_assets.py.
+    Without a manifest every path resolves to itself. When no variant covers
+    the size, the original is used, or the largest variant if the original
+    was left out of the package.
+    """
+
+    def __init__(self, base_dir, manifest_path=None, formats=("jpg",)):
+        self.base_dir = base_dir
+        self.formats = formats
+        self._images = {}
+        self._resolved = {}
+        manifest_path = manifest_path or os.path.join(base_dir, "images", "variants", "manifest.json")
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self._images = json.load(f).get("images", {})
+        except (OSError, ValueError):
+            pass
+
+    def resolve(self, path, size):
+        if not path or not self._images:
+            return path
+        width, height = int(size[0]), int(size[1])
+        key = (path, width, height)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        rel = os.path.relpath(path, self.base_dir).replace(os.sep, "/")
+        entry = self._images.get(rel)
+        best = path
+        if entry:
+            usable = [
+                v for v in entry["variants"]
+                if v["format"] in self.formats and os.path.exists(os.path.join(self.base_dir, v["path"]))
+            ]
+            covering = [v for v in usable if v["width"] >= width and v["height"] >= height]
+            if covering:
+                pick = min(covering, key=lambda v: (v["width"] * v["height"], v["bytes"]))
+                best = os.path.join(self.base_dir, pick["path"])
+            elif usable and not os.path.exists(os.path.join(self.base_dir, rel)):
+                pick = max(usable, key=lambda v: v["width"] * v["height"])
+                best = os.path.join(self.base_dir, pick["path"])
+        self._resolved[key] = best
+        return best
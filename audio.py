@@ -0,0 +1,204 @@
+"""Non-blocking audio engine.
+
+Sounds are loaded on a worker thread and handed back to the main thread, so
+nothing on the answer -> next question path ever waits on audio I/O. The
+audio provider itself is only imported by that thread, when the first sound
+is requested. Music
+tracks are opened as streams where the provider supports it, and every sound
+effect gets a small pool of voices so quick answers overlap instead of
+cutting each other off.
+"""
+import os
+import threading
+from queue import Empty, Queue
+
+from kivy.clock import mainthread
+from kivy.logger import Logger
+
+# importing kivy.core.audio picks and initialises a provider, so that
+# happens on the loader thread the first time a sound is needed
+SoundLoader = None
+MusicSDL2 = None
+
+
+def _load_providers():
+    global SoundLoader, MusicSDL2
+    if SoundLoader is not None:
+        return
+    try:
+        # streams from disk via Mix_LoadMUS instead of decoding the whole file
+        from kivy.core.audio.audio_sdl2 import MusicSDL2
+    except ImportError:
+        MusicSDL2 = None
+    from kivy.core.audio import SoundLoader as loader
+    SoundLoader = loader
+
+
+def _load_music(path):
+    if MusicSDL2 is not None:
+        try:
+            snd = MusicSDL2(source=path)
+            snd.load()
+            return snd
+        except Exception:
+            pass
+    # android's MediaPlayer provider streams on its own
+    return SoundLoader.load(path)
+
+
+class AudioEngine:
+    def __init__(self, voices=3, music_volume=0.4, prepare=None):
+        self.voices = voices
+        # prepare(path) runs on the loader thread before a file is read
+        self.prepare = prepare
+        self.music_volume = music_volume
+        self.music = None
+        self.music_path = None       # track that should be playing
+        self._music = {}             # path -> Sound or None if unavailable
+        self._sfx = {}               # path -> [Sound, ...] or None
+        self._next_voice = {}
+        self._pending = set()
+        self._queue = Queue()
+        self._worker = None
+        # bumped by suspend(); loads requested before it are dropped
+        self._generation = 0
+
+    # -------- loading --------
+    def preload_music(self, path):
+        if path and path not in self._music:
+            self._request("music", path)
+
+    def preload_sfx(self, path):
+        if path and path not in self._sfx:
+            self._request("sfx", path)
+
+    def _request(self, kind, path):
+        key = (kind, path)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="audio-loader", daemon=True)
+            self._worker.start()
+        self._queue.put((self._generation, kind, path))
+
+    def _run(self):
+        _load_providers()
+        while True:
+            generation, kind, path = self._queue.get()
+            if generation != self._generation:
+                continue
+            result = None
+            try:
+                if self.prepare is not None:
+                    self.prepare(path)
+                if os.path.exists(path):
+                    if kind == "music":
+                        result = _load_music(path)
+                    else:
+                        result = [s for s in (SoundLoader.load(path) for _ in range(self.voices)) if s]
+                        result = result or None
+            except Exception as e:
+                Logger.warning(f"Audio: could not load {path}: {e}")
+            self._loaded(generation, kind, path, result)
+
+    @mainthread
+    def _loaded(self, generation, kind, path, result):
+        if generation != self._generation:
+            # finished after suspend(): don't refill what it released
+            for snd in (result if kind == "sfx" else [result]) or ():
+                if snd is not None:
+                    snd.unload()
+            return
+        self._pending.discard((kind, path))
+        if kind == "music":
+            self._music[path] = result
+            if path == self.music_path and self.music is None:
+                self._start_music(result)
+        else:
+            self._sfx[path] = result
+
+    # -------- music --------
+    def play_music(self, path):
+        if path == self.music_path and self.music is not None:
+            return
+        self.stop_music()
+        self.music_path = path
+        if not path:
+            return
+        if path in self._music:
+            self._start_music(self._music[path])
+        else:
+            # starts as soon as the loader hands it back
+            self._request("music", path)
+
+    def _start_music(self, snd):
+        if snd is None:
+            return
+        self.music = snd
+        try:
+            snd.loop = True
+        except Exception:
+            pass
+        snd.volume = self.music_volume
+        snd.play()
+
+    def stop_music(self):
+        if self.music:
+            self.music.stop()
+        self.music = None
+        self.music_path = None
+
+    # -------- app pause --------
+    def suspend(self):
+        """Stop the music and unload every sound; returns the track that
+        was playing, for resume()."""
+        path = self.music_path
+        self.stop_music()
+        # drop the loads still queued; one in progress is discarded when done
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+            except Empty:
+                break
+        self._pending.clear()
+        for snd in self._music.values():
+            if snd is not None:
+                snd.unload()
+        for voices in self._sfx.values():
+            for snd in voices or ():
+                snd.unload()
+        self._music = {}
+        self._sfx = {}
+        self._next_voice = {}
+        return path
+
+    def resume(self, music_path=None, sfx=()):
+        # reloads happen on the loader thread; the music starts when ready
+        for path in sfx:
+            self.preload_sfx(path)
+        if music_path:
+            self.play_music(music_path)
+
+    # -------- effects --------
+    def play_sfx(self, path):
+        if not path:
+            return
+        if path not in self._sfx:
+            # not ready yet: skip this one rather than block
+            self._request("sfx", path)
+            return
+        voices = self._sfx[path]
+        if not voices:
+            return
+        for voice in voices:
+            if voice.state != "play":
+                break
+        else:
+            # all busy: steal the oldest voice
+            i = self._next_voice.get(path, 0)
+            voice = voices[i]
+            self._next_voice[path] = (i + 1) % len(voices)
+            voice.stop()
+        voice.play()
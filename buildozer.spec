@@ -20,7 +20,7 @@ package.domain = org.wolfmichel
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,kv,json,png,jpg,mp3,wav
+source.include_exts = py,kv,json,qbank,png,jpg,webp,mp3,wav,zip
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -29,12 +29,16 @@ source.include_exts = py,kv,json,png,jpg,mp3,wav
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-#source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = tools, bin
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
 #source.exclude_patterns = license,images/*/*.jpg
 
+# left empty on purpose: set at build time through APP_SOURCE_EXCLUDE_PATTERNS
+# (see tools/build_assets.py); buildozer only overrides keys present here
+source.exclude_patterns =
+
 # (str) Application versioning (method 1)
 version = 0.1
 
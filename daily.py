@@ -0,0 +1,92 @@
+"""Deterministic daily challenge.
+
+The daily set is a function of the date and the content of the question
+bank only: every device with the same bank gets the same five questions,
+and pressing the button again gives the same set. Picks come from a partial
+Fisher-Yates shuffle that only touches k positions, driven by a blake2b
+stream instead of `random`, so the result does not depend on the Python
+version either. The day's set is cached on disk by question id.
+"""
+import hashlib
+import sys
+from array import array
+from datetime import date
+
+
+def content_hash(index, positions=None):
+    """Hash of the bank's question ids in bank order; only those at
+    `positions` when given."""
+    ids = index.ids
+    if positions is not None and len(positions) != len(ids):
+        ids = array("Q", (ids[pos] for pos in positions))
+    if sys.byteorder != "little":
+        ids = type(ids)(ids)
+        ids.byteswap()
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).hexdigest()
+
+
+def _draw(seed, i, bound):
+    digest = hashlib.blake2b(i.to_bytes(4, "little"), key=seed, digest_size=8).digest()
+    return int.from_bytes(digest, "little") % bound
+
+
+def partial_shuffle(n, k, seed):
+    """First k entries of a Fisher-Yates shuffle of range(n), in O(k)."""
+    swapped = {}    # only positions that were touched
+    picked = []
+    for i in range(min(k, n)):
+        j = i + _draw(seed, i, n - i)
+        picked.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return picked
+
+
+def daily_seed(day, bank_hash):
+    return hashlib.blake2b(f"{day.isoformat()}:{bank_hash}".encode("utf-8"), digest_size=32).digest()
+
+
+def default_cache():
+    return {"version": 1, "date": "", "bank": "", "ids": []}
+
+
+class DailySet:
+    def __init__(self, index, store=None):
+        # store: optional storage.JsonStore built with default_cache
+        self.index = index
+        self.store = store
+        self._hash = None
+        self._pool = None
+
+    @property
+    def pool(self):
+        # pack chapters without precomputed metadata only hold placeholder
+        # ids until played, so they are left out of both hash and draw
+        if self._pool is None:
+            self._pool = self.index.known_positions()
+        return self._pool
+
+    @property
+    def bank_hash(self):
+        if self._hash is None:
+            self._hash = content_hash(self.index, self.pool)
+        return self._hash
+
+    def refs(self, k, today=None):
+        """(chapter index, question index) of today's k questions."""
+        today = today or date.today()
+        day = today.isoformat()
+
+        cache = self.store.data if self.store is not None else None
+        if cache is None and self.store is not None:
+            cache = self.store.load()
+        if cache and cache["date"] == day and cache["bank"] == self.bank_hash and len(cache["ids"]) >= k:
+            positions = [self.index.by_id.get(qid) for qid in cache["ids"][:k]]
+            if None not in positions:
+                return [self.index.ref(pos) for pos in positions]
+
+        pool = self.pool
+        positions = [pool[i] for i in partial_shuffle(len(pool), k, daily_seed(today, self.bank_hash))]
+        if self.store is not None:
+            cache.update(date=day, bank=self.bank_hash, ids=[self.index.ids[pos] for pos in positions])
+            self.store.save()
+        return [self.index.ref(pos) for pos in positions]
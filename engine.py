@@ -0,0 +1,444 @@
+"""Headless game engine.
+
+All adventure / daily / review game rules live here with no Kivy dependency. The app
+drives the engine and renders whatever it reports through events, which
+also lets tools/simulate.py and the benchmarks run the full game loop
+without a window.
+
+Events (callback keyword arguments):
+
+    question          question, chapter, options, number, total
+    answered          question, correct, reward, xp_gain, correct_word
+    achievement       title
+    chapter_finished  summary dict
+    game_finished     summary dict
+    daily_finished    summary dict
+    review_finished   summary dict
+"""
+import random
+from datetime import date
+
+from adaptive import AdaptiveSelector, PlayerModel
+from daily import DailySet
+from question_index import QuestionIndex
+
+
+class GameEngine:
+    QUESTIONS_PER_CHAPTER = 10
+    DAILY_SIZE = 5
+    REVIEW_SIZE = 10
+    # (coins, xp) for a correct answer per difficulty; a question's own
+    # "xp" field wins over the table
+    REWARDS = {
+        "easy": (15, 10),
+        "medium": (25, 15),
+        "hard": (50, 30),
+    }
+    DEFAULT_REWARD = (20, 10)
+
+    def __init__(self, chapters, scores=None, rng=None, index=None, player=None, review=None,
+                 daily=None):
+        self.chapters = chapters
+        self.scores = scores if scores is not None else {}
+        self.rng = rng or random.Random()
+        # pass the bank's index to keep chapters undecoded until played
+        self.index = index if index is not None else QuestionIndex.from_chapters(chapters)
+        self.player = player if player is not None else PlayerModel()
+        self.selector = AdaptiveSelector(self.index, self.player, self.rng)
+        # review.ReviewScheduler; without one there is no review mode
+        self.review = review
+        # daily.DailySet; pass one with a store to cache the day's set
+        self.daily = daily if daily is not None else DailySet(self.index)
+        self._listeners = {}
+
+        # total questions assumes 10 per chapter in adventure mode
+        self.total_questions = len(chapters) * self.QUESTIONS_PER_CHAPTER
+        self.mode = "adventure"          # "adventure", "daily" or "review"
+        self.daily_questions = []        # list of (chapter_idx, question_idx); daily and review
+        self.daily_index = 0
+        self.reset()
+
+    # -------- events --------
+    def bind(self, event, callback):
+        self._listeners.setdefault(event, []).append(callback)
+
+    def unbind(self, event, callback):
+        self._listeners.get(event, []).remove(callback)
+
+    def unbind_all(self):
+        self._listeners = {}
+
+    def emit(self, event, **kwargs):
+        for callback in self._listeners.get(event, ()):
+            callback(**kwargs)
+
+    # -------- state --------
+    def reset(self):
+        self.coins = 0
+        self.score = 0
+        self.xp = 0
+        self.chapter_index = 0
+        self.question_index = 0
+        self.chapter_scores = [0 for _ in self.chapters]
+        self.option_map = []
+
+        # ---- 10-question sets per chapter for this run ----
+        # Sizes are fixed up front; the questions themselves are picked one
+        # at a time by the adaptive selector as the chapter is played, so
+        # chapters stay undecoded until then.
+        self.chapter_sizes = [
+            min(self.QUESTIONS_PER_CHAPTER, len(self.index.chapter_range(ci)))
+            for ci in range(len(self.chapters))
+        ]
+        self.chapter_question_sets = [[] for _ in self.chapters]
+        self.selector.reset()
+        # (slot, question, option_map) resolved ahead by prefetch()
+        self._prefetched = None
+
+    def start_adventure(self):
+        self.mode = "adventure"
+        self.reset()
+        self.show_question()
+
+    def start_daily(self, today=None):
+        # daily mode: the same 5 questions for everyone on a given day
+        self.mode = "daily"
+        self.reset()
+        self.daily_questions = self.daily.refs(self.DAILY_SIZE, today)
+        self.daily_index = 0
+        self.show_question()
+
+    def start_review(self, now=None):
+        # review mode: missed questions whose spaced-repetition card is due
+        self.mode = "review"
+        self.reset()
+        self.daily_questions = []
+        if self.review is not None:
+            for qid in self.review.due(self.REVIEW_SIZE, now):
+                pos = self.index.by_id.get(qid)
+                if pos is None:
+                    self.review.forget(qid)
+                else:
+                    self.daily_questions.append(self.index.ref(pos))
+        self.daily_index = 0
+        self.show_question()
+
+    def get_current_question(self):
+        # DAILY / REVIEW MODE: uses daily_questions index into full chapters list
+        if self.mode != "adventure":
+            ci, qi = self.daily_questions[self.daily_index]
+            return self.chapters[ci]["questions"][qi]
+
+        # ADVENTURE MODE: the chapter's set, picked adaptively on first use
+        ci = self.chapter_index
+        # Safety: clamp to last question instead of crashing
+        qi = min(self.question_index, self.chapter_sizes[ci] - 1)
+        return self._adventure_question(ci, qi)
+
+    def _adventure_question(self, ci, qi):
+        # None when the chapter runs dry before its planned size; the
+        # chapter is then cut short to what it actually had
+        chapter_questions = self.chapter_question_sets[ci]
+        if not chapter_questions:
+            # a pack chapter without "meta" only gets its real index entries
+            # (and its real length) once loaded: load it before picking
+            self.chapters[ci]["questions"]
+            self.chapter_sizes[ci] = min(self.chapter_sizes[ci], len(self.index.chapter_range(ci)))
+        while len(chapter_questions) <= qi:
+            local = self.selector.pick(ci)
+            if local is None:
+                self.chapter_sizes[ci] = len(chapter_questions)
+                return None
+            chapter_questions.append(local)
+        return self.chapters[ci]["questions"][chapter_questions[qi]]
+
+    def _slot(self):
+        # identifies the question on screen within this run
+        if self.mode != "adventure":
+            return (self.mode, self.daily_index)
+        return (self.chapter_index, self.question_index)
+
+    def _shuffled_options(self, q):
+        indices = list(range(len(q["options"])))
+        self.rng.shuffle(indices)
+        return indices
+
+    def prefetch(self):
+        """Resolve and shuffle the question next_step() will show, so that
+        showing it is only a lookup. Call it after answer(); adaptive picks
+        then already see the answer. Returns (question, options) or None
+        when next_step() ends the chapter or the session instead."""
+        if self.mode != "adventure":
+            i = self.daily_index + 1
+            if i >= len(self.daily_questions):
+                return None
+            slot = (self.mode, i)
+            ci, qi = self.daily_questions[i]
+            q = self.chapters[ci]["questions"][qi]
+        else:
+            ci, qi = self.chapter_index, self.question_index + 1
+            if ci >= len(self.chapters) or qi >= self.chapter_sizes[ci]:
+                return None
+            slot = (ci, qi)
+            q = self._adventure_question(ci, qi)
+            if q is None:
+                return None
+
+        indices = self._shuffled_options(q)
+        self._prefetched = (slot, q, indices)
+        return q, [q["options"][i] for i in indices]
+
+    def current_question_number(self):
+        if self.mode != "adventure":
+            return self.daily_index + 1
+
+        # Adventure mode: count questions based on 10-question sets
+        n = 0
+        for i in range(min(self.chapter_index, len(self.chapters))):
+            n += self.chapter_sizes[i]
+        return n + self.question_index + 1
+
+    def progress_total(self):
+        if self.mode != "adventure":
+            return len(self.daily_questions)
+        return self.total_questions
+
+    # -------- flow --------
+    def show_question(self):
+        # ----- mode-specific flow -----
+        if self.mode != "adventure":
+            if not self.daily_questions or self.daily_index >= len(self.daily_questions):
+                self.finish_session()
+                return
+
+            ci, _qi = self.daily_questions[self.daily_index]
+            self.chapter_index = ci  # theme follows the chapter of the question
+
+        else:
+            if self.chapter_index >= len(self.chapters):
+                self.finish_game()
+                return
+
+            # if we've exhausted the 10 for this chapter, move on
+            if self.question_index >= self.chapter_sizes[self.chapter_index]:
+                self.finish_chapter()
+                return
+
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == self._slot():
+            _slot, q, indices = prefetched
+        else:
+            q = self.get_current_question()
+            if q is None:
+                # the chapter ran out of questions early
+                self.finish_chapter()
+                return
+            # shuffle answers visually but keep index mapping
+            indices = self._shuffled_options(q)
+        self.option_map = indices
+
+        self.emit(
+            "question",
+            question=q,
+            chapter=self.chapters[self.chapter_index],
+            options=[q["options"][i] for i in indices],
+            number=self.current_question_number(),
+            total=self.progress_total(),
+        )
+
+    def check_achievements(self):
+        """Titles unlocked by the current state that were not unlocked before."""
+        earned = []
+
+        if self.score == 5:
+            earned.append("First 5 Correct")
+        if self.score == 10:
+            earned.append("Rising Scholar")
+        if self.coins >= 100:
+            earned.append("Coin Collector")
+        if self.chapter_index == len(self.chapters) - 1:
+            earned.append("Chapter Master")
+
+        unlocked = self.scores.setdefault("achievements_unlocked", [])
+        unlocks = [title for title in earned if title not in unlocked]
+        unlocked.extend(unlocks)
+        return unlocks
+
+    def answer(self, visual_index):
+        q = self.get_current_question()
+        correct_index = q["correct_index"]
+        correct = self.option_map[visual_index] == correct_index
+
+        # ability estimate, O(1) per answer; misses also become review cards
+        self.player.update(q.get("difficulty"), correct)
+        if self.review is not None:
+            self.review.record(q["id"], correct)
+
+        reward = 0
+        xp_gain = 0
+        if correct:
+            reward, xp_gain = self.get_reward(q.get("difficulty"))
+            xp_gain = q.get("xp", xp_gain)
+
+            self.score += 1
+            self.coins += reward
+            self.xp += xp_gain
+
+            if self.mode == "adventure":
+                self.chapter_scores[self.chapter_index] += 1
+
+        result = {
+            "question": q,
+            "correct": correct,
+            "reward": reward,
+            "xp_gain": xp_gain,
+            "correct_word": q["options"][correct_index],
+        }
+        self.emit("answered", **result)
+        if correct:
+            for title in self.check_achievements():
+                self.emit("achievement", title=title)
+        return result
+
+    def get_reward(self, difficulty):
+        return self.REWARDS.get(difficulty, self.DEFAULT_REWARD)
+
+    def next_step(self):
+        # ----- DAILY / REVIEW MODE -----
+        if self.mode != "adventure":
+            if self.daily_index < len(self.daily_questions) - 1:
+                self.daily_index += 1
+                self.show_question()
+            else:
+                self.finish_session()
+            return
+
+        # ----- ADVENTURE MODE -----
+        if self.question_index < self.chapter_sizes[self.chapter_index] - 1:
+            self.question_index += 1
+            self.show_question()
+        else:
+            # finished this chapter's 10 questions
+            self.finish_chapter()
+
+    def continue_to_next_chapter(self):
+        self.chapter_index += 1
+        self.question_index = 0
+        self.show_question()
+
+    def finish_session(self):
+        if self.mode == "review":
+            self.finish_review()
+        else:
+            self.finish_daily()
+
+    def finish_chapter(self):
+        chapter_total = self.chapter_sizes[self.chapter_index]
+        chapter_correct = self.chapter_scores[self.chapter_index]
+        summary = {
+            "chapter": self.chapters[self.chapter_index],
+            "correct": chapter_correct,
+            "total": chapter_total,
+            "accuracy": (chapter_correct / chapter_total) * 100.0 if chapter_total else 0.0,
+            "question_number": self.current_question_number(),
+            "coins": self.coins,
+            "last": self.chapter_index == len(self.chapters) - 1,
+        }
+        self.emit("chapter_finished", summary=summary)
+        if summary["last"]:
+            self.finish_game()
+
+    def finish_game(self):
+        total_questions = self.total_questions or 1
+        accuracy = (self.score / total_questions) * 100.0
+        self.update_scores(self.score, accuracy, self.coins)
+        self.emit("game_finished", summary={
+            "score": self.score,
+            "total": total_questions,
+            "accuracy": accuracy,
+            "coins": self.coins,
+        })
+
+    def update_scores(self, final_score, accuracy, total_coins):
+        # adventure-mode final only
+        scores = self.scores
+        if final_score > scores.get("best_score", 0):
+            scores["best_score"] = final_score
+        if accuracy > scores.get("best_accuracy", 0.0):
+            scores["best_accuracy"] = accuracy
+
+        scores["total_coins_earned"] = scores.get("total_coins_earned", 0) + total_coins
+        scores["coin_balance"] = scores.get("coin_balance", 0) + total_coins
+
+        scores["highest_chapter_completed"] = max(
+            scores.get("highest_chapter_completed", 1),
+            len(self.chapters),
+        )
+
+        scores["total_correct_all_time"] = scores.get("total_correct_all_time", 0) + final_score
+        scores["total_questions_all_time"] = (
+            scores.get("total_questions_all_time", 0) + self.total_questions
+        )
+        scores["max_coins_single_run"] = max(
+            scores.get("max_coins_single_run", 0),
+            total_coins,
+        )
+
+    def get_daily_bonus(self):
+        streak = self.scores.get("daily_streak", 1)
+        return min(streak * 10, 100)  # cap at 100 bonus coins
+
+    def finish_daily(self, today=None):
+        scores = self.scores
+        today = today or date.today()
+        total = len(self.daily_questions) or 1
+        accuracy = (self.score / total) * 100.0
+
+        today_str = today.isoformat()
+        last = scores.get("last_daily_date", "")
+
+        if last != today_str:
+            # already logged today keeps the streak as-is
+            if last and (today - date.fromisoformat(last)).days == 1:
+                scores["daily_streak"] = scores.get("daily_streak", 0) + 1
+            else:
+                scores["daily_streak"] = 1
+            scores["last_daily_date"] = today_str
+
+        # update coins & global stats
+        scores["total_coins_earned"] = scores.get("total_coins_earned", 0) + self.coins
+        scores["coin_balance"] = scores.get("coin_balance", 0) + self.coins
+        scores["total_correct_all_time"] = scores.get("total_correct_all_time", 0) + self.score
+        scores["total_questions_all_time"] = scores.get("total_questions_all_time", 0) + total
+        scores["max_coins_single_run"] = max(scores.get("max_coins_single_run", 0), self.coins)
+
+        bonus = self.get_daily_bonus()
+        self.coins += bonus
+        scores["coin_balance"] += bonus
+
+        self.emit("daily_finished", summary={
+            "score": self.score,
+            "total": total,
+            "accuracy": accuracy,
+            "bonus": bonus,
+            "coins": self.coins,
+            "streak": scores.get("daily_streak", 0),
+        })
+
+    def finish_review(self):
+        scores = self.scores
+        total = len(self.daily_questions)
+        accuracy = (self.score / total) * 100.0 if total else 0.0
+
+        scores["total_coins_earned"] = scores.get("total_coins_earned", 0) + self.coins
+        scores["coin_balance"] = scores.get("coin_balance", 0) + self.coins
+        scores["total_correct_all_time"] = scores.get("total_correct_all_time", 0) + self.score
+        scores["total_questions_all_time"] = scores.get("total_questions_all_time", 0) + total
+
+        self.emit("review_finished", summary={
+            "score": self.score,
+            "total": total,
+            "accuracy": accuracy,
+            "coins": self.coins,
+            "next_due": self.review.next_due_at() if self.review is not None else None,
+        })
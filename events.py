@@ -0,0 +1,151 @@
+"""Append-only answer event log with incrementally maintained aggregates.
+
+Every answer is appended to `answers.log` as a length-prefixed binary record.
+Per-chapter, per-difficulty and per-mode totals are updated in memory as
+answers come in and snapshotted to `answers_stats.json` together with the
+log offset they cover, so the profile screen reads them in O(1). On start
+only the part of the log written after the last snapshot (after a crash) is
+replayed. Appends are buffered and written by a background thread.
+"""
+import json
+import os
+import struct
+import threading
+import time
+
+from kivy.logger import Logger
+
+from question_bank import DIFFICULTIES, NO_DIFFICULTY
+from storage import write_atomic
+
+MODES = ("adventure", "daily", "review")
+
+LENGTH = struct.Struct("<H")
+# question id, chapter, difficulty code, correct, mode code, latency ms,
+# unix timestamp
+RECORD = struct.Struct("<QHBBBII")
+
+
+def _empty_stats():
+    # each bucket is [answered, correct, latency_ms_total]
+    return {"log_offset": 0, "total": [0, 0, 0], "chapters": {}, "difficulty": {}, "modes": {}}
+
+
+class AnswerLog:
+    def __init__(self, log_path, stats_path, delay=1.0):
+        self.log_path = log_path
+        self.stats_path = stats_path
+        self.delay = delay
+        self.stats = _empty_stats()
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._worker = None
+
+    # -------- loading --------
+    def load(self):
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError):
+            self.stats = _empty_stats()
+
+        # replay whatever reached the log after the last snapshot
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        if size < self.stats["log_offset"]:
+            # log was replaced or truncated: rebuild from scratch
+            self.stats = _empty_stats()
+        if size > self.stats["log_offset"]:
+            with open(self.log_path, "rb") as f:
+                f.seek(self.stats["log_offset"])
+                tail = f.read()
+            self.stats["log_offset"] += self._replay(tail)
+        return self.stats
+
+    def _replay(self, data):
+        pos = 0
+        while pos + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, pos)
+            end = pos + LENGTH.size + length
+            if end > len(data) or length < RECORD.size:
+                break  # torn final record
+            _qid, chapter, difficulty, correct, mode, latency_ms, _ts = RECORD.unpack_from(data, pos + LENGTH.size)
+            self._count(chapter, difficulty, correct, mode, latency_ms)
+            pos = end
+        return pos
+
+    # -------- aggregates --------
+    def _count(self, chapter, difficulty, correct, mode, latency_ms):
+        buckets = [
+            self.stats["total"],
+            self.stats["chapters"].setdefault(str(chapter), [0, 0, 0]),
+            self.stats["modes"].setdefault(MODES[mode] if mode < len(MODES) else str(mode), [0, 0, 0]),
+        ]
+        if difficulty != NO_DIFFICULTY:
+            buckets.append(self.stats["difficulty"].setdefault(DIFFICULTIES[difficulty], [0, 0, 0]))
+        for b in buckets:
+            b[0] += 1
+            b[1] += 1 if correct else 0
+            b[2] += latency_ms
+
+    def accuracy(self, group, key=None):
+        """Accuracy in percent for "total" or a chapter/difficulty/mode key."""
+        bucket = self.stats["total"] if group == "total" else self.stats[group].get(str(key))
+        if not bucket or not bucket[0]:
+            return None
+        return bucket[1] / bucket[0] * 100.0
+
+    # -------- recording --------
+    def record(self, qid, chapter, difficulty, correct, latency_ms, mode):
+        diff_code = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else NO_DIFFICULTY
+        mode_code = MODES.index(mode) if mode in MODES else 0xFF
+        latency_ms = max(0, int(latency_ms))
+        payload = RECORD.pack(qid, chapter, diff_code, 1 if correct else 0,
+                              mode_code, latency_ms, int(time.time()))
+        with self._cond:
+            self._count(chapter, diff_code, correct, mode_code, latency_ms)
+            self._buffer.append(LENGTH.pack(len(payload)) + payload)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="answer-log", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def flush(self):
+        # taking and writing under one lock keeps chunks in log order
+        with self._write_lock:
+            with self._cond:
+                chunk, snapshot = self._take()
+            if chunk:
+                self._write(chunk, snapshot)
+
+    def _take(self):
+        chunk = b"".join(self._buffer)
+        self._buffer = []
+        self.stats["log_offset"] += len(chunk)
+        return chunk, json.dumps(self.stats)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer:
+                    self._cond.wait()
+                # let a few answers accumulate before touching the disk
+                deadline = time.monotonic() + self.delay
+                remaining = self.delay
+                while remaining > 0:
+                    self._cond.wait(remaining)
+                    remaining = deadline - time.monotonic()
+            self.flush()
+
+    def _write(self, chunk, snapshot):
+        try:
+            with open(self.log_path, "ab") as f:
+                f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            write_atomic(self.stats_path, snapshot)
+        except OSError as e:
+            Logger.error(f"Events: could not write answer log: {e}")
@@ -0,0 +1,83 @@
+"""Frame-rate governor.
+
+Kivy redraws at the configured maximum frame rate whether or not anything
+on screen changes. Most of the time nothing does (menus, result screens,
+a question waiting for an answer), so the governor lowers the clock's
+frame cap once no tween or Animation has run and no input has arrived for
+a moment, and puts it back on the first touch, key or animation.
+
+Kivy has no public setter for the frame cap. The governor goes through the
+Clock's private _max_fps (set from graphics.maxfps and read on every frame
+by ClockBase in Kivy 2.x; checked against 2.3.0), and only via
+clock_max_fps() below, so a Kivy without it leaves the frame rate alone.
+"""
+from kivy.animation import Animation
+from kivy.clock import Clock
+
+IDLE_FPS = 15
+IDLE_AFTER = 1.5        # seconds without animation or input
+CHECK_INTERVAL = 0.25
+
+
+def clock_max_fps(fps=None):
+    """The Clock's frame cap (0 means uncapped), set to `fps` first when
+    given; None if this Kivy's clock has no _max_fps."""
+    if not hasattr(Clock, "_max_fps"):
+        return None
+    if fps is not None:
+        Clock._max_fps = fps
+    return Clock._max_fps
+
+
+class FrameGovernor:
+    def __init__(self, tweens, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER):
+        self.tweens = tweens
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        # kivy's own cap (graphics.maxfps); None when it cannot be changed
+        self.active_fps = clock_max_fps()
+        self.fps = self.active_fps
+        self.window = None
+        self._last_activity = 0.0
+        self._event = None
+        self.idle_switches = 0
+
+    def start(self, window):
+        self.window = window
+        window.bind(on_touch_down=self.wake, on_touch_move=self.wake, on_key_down=self.wake)
+        # a tween started from a Clock callback gets full rate right away
+        self.tweens.on_running = self.wake
+        self.resume()
+
+    def resume(self):
+        self.wake()
+        if self._event is None and self.active_fps is not None:
+            self._event = Clock.schedule_interval(self._check, CHECK_INTERVAL)
+
+    def suspend(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._set(self.active_fps)
+
+    def wake(self, *_args):
+        self._last_activity = Clock.get_boottime()
+        self._set(self.active_fps)
+
+    def is_busy(self):
+        return len(self.tweens) > 0 or bool(Animation._instances)
+
+    def _check(self, _dt):
+        now = Clock.get_boottime()
+        if self.is_busy():
+            self._last_activity = now
+            self._set(self.active_fps)
+        elif now - self._last_activity >= self.idle_after:
+            if self.fps != self.idle_fps:
+                self.idle_switches += 1
+            self._set(self.idle_fps)
+
+    def _set(self, fps):
+        if self.active_fps is not None and self.fps != fps:
+            self.fps = fps
+            clock_max_fps(fps)
@@ -1,23 +1,58 @@
-import os
 import json
-import random
-from datetime import date
-
+import os
+import struct
+import sys
+import time
+
+_IMPORT_START = time.perf_counter()
+# kivy parses the command line when it is imported, so take our flag off first
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove("--profile-startup")
+
+# Nothing here may open the window or an audio provider: the window is
+# created in build() (see open_window) and audio on its loader thread.
 from kivy.app import App
+from kivy.config import Config
 from kivy.lang import Builder
 from kivy.clock import Clock
-from kivy.animation import Animation
-from kivy.core.window import Window
-from kivy.core.audio import SoundLoader
-from kivy.uix.screenmanager import ScreenManager, Screen, FadeTransition
+from kivy.logger import Logger
+from kivy.utils import platform
+from kivy.uix.screenmanager import Screen, FadeTransition
 from kivy.uix.label import Label
+from kivy.uix.image import Image
 from kivy.factory import Factory
-from kivy.uix.modalview import ModalView
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.properties import StringProperty, NumericProperty, ListProperty
-
-Window.size = (900, 600)
+from kivy.properties import (
+    BooleanProperty, StringProperty, NumericProperty, ListProperty, ObjectProperty
+)
+
+import question_bank
+import packs
+from question_index import QuestionIndex
+from assets import BackgroundCache, VariantResolver
+from audio import AudioEngine
+from theme import ThemeController
+from storage import ScoreStore, JsonStore
+from adaptive import PlayerModel, default_model
+from review import ReviewScheduler, default_deck
+from daily import DailySet, default_cache
+from events import AnswerLog
+from engine import GameEngine
+from pools import WidgetPool, TextTextures, LabelTextureCache
+from screens import LazyScreenManager
+from tween import TweenEngine
+from governor import FrameGovernor
+from notifications import NotificationScheduler, REWARD, ACHIEVEMENT
+import profiling
+
+# popup classes are imported when the first popup is built, not at startup
+Factory.register("RewardPopup", module="popups")
+
+STARTUP = profiling.StartupTimer(_IMPORT_START) if PROFILE_STARTUP else None
+if STARTUP:
+    STARTUP.mark("import")
+
+WINDOW_SIZE = (900, 600)    # desktop only; phones use the screen size
 
 
 class WelcomeScreen(Screen):
@@ -41,15 +76,12 @@ class GameScreen(Screen):
 
     # per-chapter theme
     bg_source = StringProperty("")
+    bg_texture = ObjectProperty(None, allownone=True)
     accent_color = ListProperty([0.12, 0.04, 0.25, 1])
     banner_color = ListProperty([0.15, 0.02, 0.25, 1])
     button_color = ListProperty([0.2, 0.9, 0.9, 1])
     button_down_color = ListProperty([0.9, 0.6, 0.2, 1])
 
-    def animate_coins(self):
-        label = self.ids.coin_label
-        Animation(font_size=30, d=0.12) + Animation(font_size=20, d=0.12)
-
 
 class ChapterEndScreen(Screen):
     chapter_title = StringProperty("")
@@ -79,123 +111,64 @@ class SkinsScreen(Screen):
 
 
 class DailyResultScreen(Screen):
+    title_text = StringProperty("Daily Challenge Complete!")
     result_text = StringProperty("")
     streak_text = StringProperty("")
     coins_text = StringProperty("0")
 
 
-class RewardPopup(ModalView):
-    reward_text = StringProperty("")
+# game screen labels whose textures come from AdventureApp.label_textures
+GAME_TEXT_LABELS = ("question_lbl", "opt1", "opt2", "opt3", "opt4")
 
+# name -> screen class; each screen's rules are in kv/<name>.kv
+SCREENS = (
+    ("welcome", WelcomeScreen),
+    ("game", GameScreen),
+    ("chapter_end", ChapterEndScreen),
+    ("end", EndScreen),
+    ("profile", ProfileScreen),
+    ("skins", SkinsScreen),
+    ("daily_end", DailyResultScreen),
+)
 
 
 class AdventureApp(App):
+    # decoded chapter backgrounds kept on the GPU
+    BACKGROUND_CACHE_BYTES = 48 * 1024 * 1024
+    # background variant formats this build can decode, in preference order
+    BACKGROUND_FORMATS = ("jpg",)
+    # answer pipeline: scoring, feedback and saving happen on the tap, the
+    # next question is prepared PREFETCH_DELAY s later while the feedback
+    # plays, and shown once the feedback has been up for
+    # (correct, wrong) seconds
+    PREFETCH_DELAY = 0.05
+    FEEDBACK_TIME = (0.6, 1.0)
+    RAPID_FEEDBACK_TIME = (0.25, 0.6)
+    # rendered game screen texts kept for reuse
+    LABEL_TEXTURE_BYTES = 16 * 1024 * 1024
+
+    # rapid mode: shorter feedback, and a tap during it skips ahead
+    rapid_mode = BooleanProperty(False)
+
     def build(self):
         self.title = "Black Excellence Word Adventure"
 
-        # runtime state
+        # runtime state (game state itself lives on self.engine)
         self.player_name = "Player"
-        self.coins = 0
-        self.score = 0
-        self.chapter_index = 0
-        self.question_index = 0
         self.is_locked = False
+        self._next_step_event = None
+        self._prefetch_event = None
+        self._reward_popup = None
 
         base_dir = os.path.dirname(__file__)
         self.coin_image = os.path.join(base_dir, "images", "coin.png")
+        # bg_image paths below are resolved to device-sized variants at runtime
+        self.bg_resolver = VariantResolver(base_dir, formats=self.BACKGROUND_FORMATS)
 
 
-        # --- Per-chapter themes (T1: hard switch) ---
-        CHAPTER_THEMES = [
-            # 1) Black Movies & Cinema
-            {
-                "bg_image": os.path.join(base_dir, "images", "default_bg.jpg"),
-                "music": os.path.join(base_dir, "audio", "cinema_synthwave.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "ping_soft.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_low.wav"),
-                "accent_color": [0.20, 0.01, 0.12, 1],
-                "banner_color": [0.45, 0.00, 0.20, 1],
-                "button_color": [1.00, 0.23, 0.66, 1],
-                "button_down_color": [1.00, 0.60, 0.30, 1],
-            },
-            # 2) Black Scientists & Inventors
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch2_science.jpg"),
-                "music": os.path.join(base_dir, "audio", "tech_glow_loop.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "ping_science.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_error.wav"),
-                "accent_color": [0.03, 0.05, 0.18, 1],
-                "banner_color": [0.00, 0.24, 0.40, 1],
-                "button_color": [0.30, 0.80, 1.00, 1],
-                "button_down_color": [0.10, 0.50, 0.90, 1],
-            },
-            # 3) Black History & Civil Rights
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch3_history.jpg"),
-                "music": os.path.join(base_dir, "audio", "heritage_ambient.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "chime_victory.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_warning.wav"),
-                "accent_color": [0.10, 0.04, 0.16, 1],
-                "banner_color": [0.25, 0.10, 0.30, 1],
-                "button_color": [0.83, 0.71, 0.22, 1],
-                "button_down_color": [0.98, 0.82, 0.30, 1],
-            },
-            # 4) Black Sports Legends
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch4_sports.jpg"),
-                "music": os.path.join(base_dir, "audio", "sports_energy.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "click_score.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_fast.wav"),
-                "accent_color": [0.00, 0.10, 0.05, 1],
-                "banner_color": [0.00, 0.30, 0.15, 1],
-                "button_color": [0.00, 1.00, 0.50, 1],
-                "button_down_color": [0.20, 0.80, 0.40, 1],
-            },
-            # 5) Black Innovation & Technology
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch5_tech.jpg"),
-                "music": os.path.join(base_dir, "audio", "cyberpulse_loop.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "ping_digital.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_glitch.wav"),
-                "accent_color": [0.08, 0.02, 0.16, 1],
-                "banner_color": [0.18, 0.00, 0.35, 1],
-                "button_color": [0.61, 0.35, 1.00, 1],
-                "button_down_color": [0.80, 0.55, 1.00, 1],
-            },
-            # 6) Black Music & Culture
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch6_music.jpg"),
-                "music": os.path.join(base_dir, "audio", "neon_groove.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "ping_beat.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_flat.wav"),
-                "accent_color": [0.16, 0.06, 0.03, 1],
-                "banner_color": [0.25, 0.08, 0.02, 1],
-                "button_color": [1.00, 0.44, 0.26, 1],
-                "button_down_color": [1.00, 0.65, 0.30, 1],
-            },
-            # 7) Black Art, Fashion & Design
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch7_art.jpg"),
-                "music": os.path.join(base_dir, "audio", "studio_ambient.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "chime_soft.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_low2.wav"),
-                "accent_color": [0.02, 0.12, 0.16, 1],
-                "banner_color": [0.00, 0.30, 0.40, 1],
-                "button_color": [0.00, 0.83, 1.00, 1],
-                "button_down_color": [0.20, 0.95, 1.00, 1],
-            },
-            # 8) Black Literature & Storytelling
-            {
-                "bg_image": os.path.join(base_dir, "images", "ch8_literature.jpg"),
-                "music": os.path.join(base_dir, "audio", "literary_ethereal.mp3"),
-                "sfx_correct": os.path.join(base_dir, "audio", "ping_glass.wav"),
-                "sfx_wrong": os.path.join(base_dir, "audio", "buzz_soft.wav"),
-                "accent_color": [0.06, 0.06, 0.16, 1],
-                "banner_color": [0.17, 0.19, 0.40, 1],
-                "button_color": [0.62, 0.70, 0.96, 1],
-                "button_down_color": [0.83, 0.88, 0.98, 1],
-            },
-        ]
+        # per-chapter themes for the built-in chapters, in chapter order;
+        # content packs carry their own in their manifests
+        CHAPTER_THEMES = self.load_themes(base_dir)
 
         # --- Skins (Option 1: tint on top of chapter themes) ---
         SKINS = {
@@ -230,231 +203,319 @@ class AdventureApp(App):
         }
         self.SKINS = SKINS
 
-        # ✅ Load chapters from JSON file instead of Python
-        self.chapters = self.load_questions()
+        # ✅ Load chapters from the compiled question bank (lazy per chapter)
+        self.question_bank = None
+        self.question_index = None
+        self.chapters = self.load_questions(base_dir)
 
         # attach themes by index
         for i, ch in enumerate(self.chapters):
             if i < len(CHAPTER_THEMES):
                 ch["theme"] = CHAPTER_THEMES[i]
 
-        # total questions assumes 10 per chapter in adventure mode
-        self.total_questions_per_chapter = 10
-        self.total_questions = len(self.chapters) * self.total_questions_per_chapter
-        self.chapter_scores = [0 for _ in self.chapters]
+        # content packs come after the built-in chapters: bundled ones and
+        # downloaded ones in the user data directory. Only their manifests
+        # are read here, chapter files stream in when played
+        self.packs = packs.discover(
+            [os.path.join(base_dir, "packs"), os.path.join(self.user_data_dir, "packs")],
+            os.path.join(self.user_data_dir, "pack_cache"),
+        )
+        for pack in self.packs:
+            self.chapters.extend(pack.chapters(self.question_index))
 
         # persistent scores
         self.score_file = os.path.join(base_dir, "scores.json")
+        self.store = ScoreStore(self.score_file)
         self.scores = self.load_scores()
+        self.rapid_mode = self.scores["rapid_mode"]
+
+        # adaptive difficulty: ability estimate kept next to scores.json
+        self.player_store = JsonStore(os.path.join(base_dir, "player_model.json"), default_model)
+        self.player_model = PlayerModel(self.player_store.load())
+        # missed-question cards; review.json is read on a worker in on_start
+        self.review_deck = ReviewScheduler(JsonStore(os.path.join(base_dir, "review.json"), default_deck))
+
+        # per-answer history; aggregates are kept incrementally
+        self.answer_log = AnswerLog(
+            os.path.join(base_dir, "answers.log"),
+            os.path.join(base_dir, "answers_stats.json"),
+        )
+        self.answer_log.load()
+        self.question_shown_at = 0.0
+        self.answer_latency_ms = 0
+        if STARTUP:
+            STARTUP.mark("data")
+
+        # everything above runs without a window; textures need one
+        self.window = self.open_window()
+        if STARTUP:
+            STARTUP.mark("window")
 
         # runtime theme / mode
-        self.bg_music = None
-        self.snd_correct = None
-        self.snd_wrong = None
-        self.sound_cache = {}
+        self.audio = AudioEngine(prepare=packs.extract)
+        self.sfx_correct = None
+        self.sfx_wrong = None
+        self.backgrounds = BackgroundCache(self.BACKGROUND_CACHE_BYTES, prepare=packs.extract)
+        self.theme = ThemeController()
         self.active_theme_index = None
-        self.mode = "adventure"         # "adventure" or "daily"
-        self.daily_questions = []       # list of (chapter_idx, question_idx)
-        self.daily_index = 0
-        self.xp = 0
-
-        Builder.load_file("adventure.kv")
-
-        sm = ScreenManager(transition=FadeTransition(duration=0.25))
-        sm.add_widget(WelcomeScreen(name="welcome"))
-        sm.add_widget(GameScreen(name="game"))
-        sm.add_widget(ChapterEndScreen(name="chapter_end"))
-        sm.add_widget(EndScreen(name="end"))
-        sm.add_widget(ProfileScreen(name="profile"))
-        sm.add_widget(SkinsScreen(name="skins"))
-        sm.add_widget(DailyResultScreen(name="daily_end"))
 
+        # correct-answer feedback widgets are pooled; "+N" texts are rendered once
+        self.coin_textures = TextTextures(font_size=52, bold=True)
+        self.coin_textures.prerender(
+            f"+{coins}" for coins, _xp in {GameEngine.DEFAULT_REWARD, *GameEngine.REWARDS.values()}
+        )
+        self.coin_fly_pool = WidgetPool(self._make_coin_fly, reset=self._reset_coin_fly)
+        self.reward_popup_pool = WidgetPool(self._make_reward_popup)
+        self._achievement_view = None
+        # every UI effect runs on this one frame callback
+        self.tweens = TweenEngine()
+        # full frame rate only while something moves (started in on_start)
+        self.governor = FrameGovernor(self.tweens)
+        self._paused_music = None
+        # rendered question / option / feedback texts, reused across
+        # questions and runs; the next question's are rendered ahead
+        self.label_textures = LabelTextureCache(self.LABEL_TEXTURE_BYTES)
+
+        # rewards / achievements are queued, merged and shown a few at a time
+        self.notifications = NotificationScheduler(self.show_notification)
+
+        # opt-in instrumentation (BE_PROFILE=1); installed before the engine
+        # binds so the wrapped handlers are the ones it calls
+        self.profiler = None
+        if profiling.enabled():
+            self.profiler = profiling.Profiler()
+            self.profiler.install(self)
+
+        # game rules; the app renders the engine's events
+        # today's daily set, cached by question id for repeat launches
+        self.daily_set = DailySet(
+            self.question_index, JsonStore(os.path.join(base_dir, "daily.json"), default_cache)
+        )
+        self.engine = GameEngine(self.chapters, self.scores, index=self.question_index,
+                                 player=self.player_model, review=self.review_deck,
+                                 daily=self.daily_set)
+        self.engine.bind("question", self.on_engine_question)
+        self.engine.bind("answered", self.on_engine_answered)
+        self.engine.bind("achievement", self.on_engine_achievement)
+        self.engine.bind("chapter_finished", self.on_chapter_finished)
+        self.engine.bind("game_finished", self.on_game_finished)
+        self.engine.bind("daily_finished", self.on_daily_finished)
+        self.engine.bind("review_finished", self.on_review_finished)
+
+        # widgets shared by every screen; each screen's rules load with it
+        if STARTUP:
+            STARTUP.mark("setup")
+        kv_dir = os.path.join(base_dir, "kv")
+        Builder.load_file(os.path.join(kv_dir, "common.kv"))
+        if STARTUP:
+            STARTUP.mark("kv")
+        # warm the pools so the first correct answer does not build widgets
+        self.reward_popup_pool.prefill(1)
+        self.coin_fly_pool.prefill(2)
+
+        # only the welcome screen is built now, the rest on first use or
+        # in the background once the app is up (see on_start)
+        sm = LazyScreenManager(transition=FadeTransition(duration=0.25))
+        for name, cls in SCREENS:
+            sm.register(name, cls, os.path.join(kv_dir, f"{name}.kv"))
+        sm.get_screen("welcome")
+        if STARTUP:
+            STARTUP.mark("screens")
 
         self.sm = sm
 
+        # decode the first chapter's background while the welcome screen is up
+        if self.chapters:
+            self.backgrounds.preload(self.resolve_background(self.chapters[0].get("theme", {})))
+
         return sm
 
+    def open_window(self):
+        # the window is created on first import; size it through Config
+        # beforehand instead of resizing it once it is open
+        if platform not in ("android", "ios"):
+            Config.set("graphics", "width", str(WINDOW_SIZE[0]))
+            Config.set("graphics", "height", str(WINDOW_SIZE[1]))
+        from kivy.core.window import Window
+        return Window
+
 
     #------------------------------------
     #-----LOAD QUESTION FUNCTION---------
     #------------------------------------
 
-    def load_questions(self):
-        with open("questions.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data["chapters"]
+    def load_themes(self, base_dir):
+        try:
+            with open(os.path.join(base_dir, "themes.json"), "r", encoding="utf-8") as f:
+                themes = json.load(f)["themes"]
+        except (OSError, ValueError, KeyError) as e:
+            Logger.error(f"Theme: could not read themes.json: {e}")
+            return []
+        for theme in themes:
+            for key in packs.ASSET_KEYS:
+                if theme.get(key):
+                    theme[key] = os.path.join(base_dir, theme[key])
+        return themes
+
+    def load_questions(self, base_dir):
+        json_path = os.path.join(base_dir, "questions.json")
+        bank_path = os.path.join(base_dir, "questions.qbank")
+
+        # questions.qbank is normally produced at build time
+        # (python question_bank.py); rebuild it if questions.json was edited
+        try:
+            if question_bank.is_stale(bank_path, json_path):
+                question_bank.compile_bank(json_path, bank_path)
+            self.question_bank = question_bank.QuestionBank(bank_path)
+            # ids / difficulty / tags only; question text stays in the bank
+            self.question_index = QuestionIndex.from_bank(self.question_bank)
+            return self.question_bank.chapters()
+        except (OSError, ValueError, struct.error):
+            # read-only install or broken / truncated bank: fall back to plain JSON
+            self.question_bank = None
+            chapters = question_bank.chapters_from_json(json_path)
+            self.question_index = QuestionIndex.from_chapters(chapters)
+            return chapters
 
     # -------- scores --------
     def load_scores(self):
-        default = {
-            "best_score": 0,
-            "best_accuracy": 0.0,
-            "total_coins_earned": 0,      # lifetime earned
-            "coin_balance": 0,            # spendable coins for skins
-            "highest_chapter_completed": 1,
-            "total_correct_all_time": 0,
-            "total_questions_all_time": 0,
-            "max_coins_single_run": 0,
-            "daily_streak": 0,
-            "last_daily_date": "",
-            "skins_unlocked": ["default"],
-            "active_skin": "default",
-        }
-        if not os.path.exists(self.score_file):
-            return default
-        try:
-            with open(self.score_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            for k, v in default.items():
-                data.setdefault(k, v)
-            return data
-        except Exception:
-            return default
+        # defaults and schema migrations live in storage.py
+        return self.store.load()
 
     def save_scores(self):
-        try:
-            with open(self.score_file, "w", encoding="utf-8") as f:
-                json.dump(self.scores, f, indent=4)
-        except Exception:
-            pass
-
-    def update_scores(self, final_score, accuracy, total_coins):
-        # adventure-mode final only
-        if final_score > self.scores.get("best_score", 0):
-            self.scores["best_score"] = final_score
-        if accuracy > self.scores.get("best_accuracy", 0.0):
-            self.scores["best_accuracy"] = accuracy
-
-        self.scores["total_coins_earned"] = (
-            self.scores.get("total_coins_earned", 0) + total_coins
-        )
-        self.scores["coin_balance"] = (
-            self.scores.get("coin_balance", 0) + total_coins
-        )
-
-        self.scores["highest_chapter_completed"] = max(
-            self.scores.get("highest_chapter_completed", 1),
-            len(self.chapters),
-        )
-
-        self.scores["total_correct_all_time"] = (
-            self.scores.get("total_correct_all_time", 0) + final_score
-        )
-        self.scores["total_questions_all_time"] = (
-            self.scores.get("total_questions_all_time", 0) + self.total_questions
-        )
-        self.scores["max_coins_single_run"] = max(
-            self.scores.get("max_coins_single_run", 0),
-            total_coins,
-        )
-
-        self.save_scores()
+        # debounced: written atomically on the store's thread
+        self.store.save()
 
-    # -------- helpers for skins / questions --------
+    # -------- helpers for skins --------
     def get_active_skin(self):
         name = self.scores.get("active_skin", "default")
         return self.SKINS.get(name, self.SKINS["default"])
 
-    def get_all_question_refs(self):
-        refs = []
-        for ci, ch in enumerate(self.chapters):
-            for qi, _ in enumerate(ch["questions"]):
-                refs.append((ci, qi))
-        return refs
-
-    def group_by_difficulty(self, questions):
-        groups = {"easy": [], "medium": [], "hard": []}
-        for q in questions:
-            difficulty = q.get("difficulty", "easy")
-            earned_coins, earned_xp = self.get_reward(difficulty)
-
-        return groups
-
     # -------- audio / theme --------
-    def load_sound(self, path):
-        if not path:
-            return None
-        if path in self.sound_cache:
-            return self.sound_cache[path]
-        if not os.path.exists(path):
-            return None
-        snd = SoundLoader.load(path)
-        self.sound_cache[path] = snd
-        return snd
-
     def apply_chapter_theme(self):
         if not self.chapters:
             return
-        idx = self.chapter_index
+        idx = self.engine.chapter_index
+
+        skin_name = self.scores.get("active_skin", "default")
+
+        # same chapter and skin as what is on screen: nothing to do, and the
+        # chapter music keeps playing
+        if self.theme.is_applied(idx, skin_name):
+            return
 
         chapter = self.chapters[idx]
         theme = chapter.get("theme", {})
         self.active_theme_index = idx
+        self.theme.mark_applied(idx, skin_name)
 
         game = self.sm.get_screen("game")
 
-        # base colors from chapter
-        banner = theme.get("banner_color", game.banner_color)
-        accent = theme.get("accent_color", game.accent_color)
-        button = theme.get("button_color", game.button_color)
-        button_down = theme.get("button_down_color", game.button_down_color)
-
-        # apply skin tint on top (Option 1: keep chapter identity)
-        skin = self.get_active_skin()
-
-        def add_color(c, t):
-            return [max(0, min(1, c[i] + t[i])) for i in range(4)]
-
-        banner = add_color(banner, skin["banner_tint"])
-        accent = add_color(accent, skin["accent_tint"])
-        button = add_color(button, skin["button_tint"])
-        button_down = [min(1, x * 0.85) for x in button]
-
-        game.banner_color = banner
-        game.accent_color = accent
-        game.button_color = button
-        game.button_down_color = button_down
+        # skin-tinted colors are cached per (chapter, skin)
+        palette = self.theme.palette(idx, theme, skin_name, self.get_active_skin())
+        self.theme.push_palette(game, palette)
 
         if theme.get("bg_image"):
-            game.bg_source = theme["bg_image"]
+            self.theme.push(game, "bg_source", self.resolve_background(theme))
+            self.theme.push(game, "bg_texture", self.backgrounds.get(game.bg_source))
+            Logger.debug(f"Assets: background cache {self.backgrounds.stats()}")
+
+        self.preload_upcoming_assets()
 
+        # all audio loading happens on the engine's worker thread
         music_path = theme.get("music")
         if music_path:
-            if self.bg_music:
-                self.bg_music.stop()
-            self.bg_music = self.load_sound(music_path)
-            if self.bg_music:
-                try:
-                    self.bg_music.loop = True
-                except Exception:
-                    pass
-                self.bg_music.volume = 0.4
-                self.bg_music.play()
-
-        self.snd_correct = self.load_sound(theme.get("sfx_correct"))
-        self.snd_wrong = self.load_sound(theme.get("sfx_wrong"))
+            self.audio.play_music(music_path)
+
+        self.sfx_correct = theme.get("sfx_correct")
+        self.sfx_wrong = theme.get("sfx_wrong")
+        self.audio.preload_sfx(self.sfx_correct)
+        self.audio.preload_sfx(self.sfx_wrong)
+
+    def upcoming_chapter_index(self):
+        # chapter that will be themed after the current one, if any
+        engine = self.engine
+        if engine.mode != "adventure":
+            for ci, _qi in engine.daily_questions[engine.daily_index + 1:]:
+                if ci != engine.chapter_index:
+                    return ci
+            return None
+        nxt = engine.chapter_index + 1
+        if nxt < len(self.chapters) and engine.chapter_sizes[nxt]:
+            return nxt
+        return None
+
+    def preload_upcoming_assets(self):
+        nxt = self.upcoming_chapter_index()
+        if nxt is None:
+            return
+        theme = self.chapters[nxt].get("theme", {})
+        self.backgrounds.preload(self.resolve_background(theme))
+        self.audio.preload_music(theme.get("music"))
+        self.audio.preload_sfx(theme.get("sfx_correct"))
+        self.audio.preload_sfx(theme.get("sfx_wrong"))
+
+    def resolve_background(self, theme):
+        return self.bg_resolver.resolve(theme.get("bg_image"), self.window.size)
 
     def play_correct_sound(self):
-        if self.snd_correct:
-            self.snd_correct.stop()
-            self.snd_correct.play()
+        self.audio.play_sfx(self.sfx_correct)
 
     def play_wrong_sound(self):
-        if self.snd_wrong:
-            self.snd_wrong.stop()
-            self.snd_wrong.play()
+        self.audio.play_sfx(self.sfx_wrong)
+
+    def show_notification(self, kind, payload):
+        if kind == REWARD:
+            self.show_reward_popup(payload)
+        else:
+            self.show_achievement(payload)
 
-    def show_achievement(self, title):
+    def _make_achievement_view(self):
+        from kivy.uix.modalview import ModalView
         popup = ModalView(size_hint=(None, None), size=(420, 220))
-        lbl = Label(text=f"[b]Achievement Unlocked![/b]\n{title}",
-                    markup=True, halign="center", valign="middle")
+        lbl = Label(markup=True, halign="center", valign="middle")
         lbl.bind(size=lambda *_: setattr(lbl, 'text_size', lbl.size))
         popup.add_widget(lbl)
+        popup.label = lbl
+        popup.hide_trigger = Clock.create_trigger(lambda dt: popup.dismiss(), 2)
+
+        def on_dismiss(*_):
+            popup.hide_trigger.cancel()
+            self.notifications.finished(ACHIEVEMENT)
+
+        popup.bind(on_dismiss=on_dismiss)
+        return popup
+
+    def show_achievement(self, titles):
+        # one reusable view; titles unlocked together share it
+        if self._achievement_view is None:
+            self._achievement_view = self._make_achievement_view()
+        popup = self._achievement_view
+        heading = "Achievement Unlocked!" if len(titles) == 1 else "Achievements Unlocked!"
+        popup.label.text = f"[b]{heading}[/b]\n" + "\n".join(titles)
+        popup.height = 220 + 30 * (len(titles) - 1)
         popup.open()
-        Clock.schedule_once(lambda dt: popup.dismiss(), 2)
+        popup.hide_trigger()
 
-    def show_reward_popup(self, coins):
+    def _make_reward_popup(self):
         popup = Factory.RewardPopup()
+        # one reusable auto-dismiss timer per popup
+        popup.hide_trigger = Clock.create_trigger(lambda dt: self._hide_reward_popup(popup), 1.6)
+        return popup
+
+    def _hide_reward_popup(self, popup):
+        self.tweens.animate(popup, "opacity", 0, 0.2, on_complete=self._on_reward_popup_hidden)
+
+    def _on_reward_popup_hidden(self, popup):
+        if self._reward_popup is popup:
+            self._reward_popup = None
+        # already faded out, so skip ModalView's own close animation
+        popup.dismiss(animation=False)
+        self.reward_popup_pool.release(popup)
+        self.notifications.finished(REWARD)
+
+    def show_reward_popup(self, coins):
+        popup = self.reward_popup_pool.acquire()
         popup.reward_text = f"[b]+{coins} Coins[/b]"
 
         # Start tiny + invisible
@@ -462,76 +523,34 @@ class AdventureApp(App):
         popup.opacity = 0
         popup.open()
 
-        # Animate to full size with bounce
-        anim_in = (
-                Animation(opacity=1, d=0.15) &
-                Animation(size=(420, 260), d=0.35, t="out_back")
-        )
-        anim_in.start(popup)
-
-        # Auto-dismiss with shrink
-        def hide(dt):
-            anim_out = (
-                    Animation(opacity=0, d=0.2) &
-                    Animation(size=(280, 160), d=0.2)
-            )
-            anim_out.bind(on_complete=lambda *_: popup.dismiss())
-            anim_out.start(popup)
-
-        Clock.schedule_once(hide, 1.6)
-
-        # Auto-dismiss with SAFE animation
-        def hide(dt):
-            anim_out = Animation(opacity=0, d=0.2)
-            anim_out.bind(on_complete=lambda *_: popup.dismiss())
-            anim_out.start(popup)
-
-        Clock.schedule_once(hide, 1.6)
-
-        # Auto-dismiss after 1.6 seconds with fade out
-        def hide(dt):
-            anim_out = Animation(opacity=0, d=0.2)
-
-            def _dismiss(*_args):
-                popup.dismiss()
-
-            anim_out.bind(on_complete=_dismiss)
-            anim_out.start(popup)
-
-        Clock.schedule_once(hide, 1.6)
-
-    def build_daily_pool(self):
-        pool = []
-        for ci, ch in enumerate(self.chapters):
-            for level in ch["questions"]:
-                for q in ch["questions"][level]:
-                    pool.append((ci, level, q))
-        random.shuffle(pool)
-        return pool[:5]
-
-    def validate_questions(self):
-        for ch in self.chapters:
-            for diff in ["easy", "medium", "hard"]:
-                for q in ch["questions"][diff]:
-                    assert "prompt" in q
-                    assert len(q["options"]) == 4
-                    assert isinstance(q["answer"], int)
+        # Animate to full size with bounce, then fade out after 1.6 seconds
+        self.tweens.animate(popup, "opacity", 1, 0.15)
+        self.tweens.animate(popup, "width", 420, 0.35, "out_back")
+        self.tweens.animate(popup, "height", 260, 0.35, "out_back")
+        popup.hide_trigger()
+        self._reward_popup = popup
+
+    def dismiss_reward_popup(self):
+        # the next question is up: clear the view instead of waiting out
+        # the 1.6 seconds
+        popup = self._reward_popup
+        if popup is not None:
+            popup.hide_trigger.cancel()
+            self._hide_reward_popup(popup)
 
     # -------- fun facts popup --------
 
 
     # -------- game flow --------
+    # Rules live in engine.GameEngine; the methods below start it, feed it
+    # input, and render the events it emits.
     def reset_state(self):
-        self.coins = 0
-        self.score = 0
-        self.chapter_index = 0
-        self.question_index = 0
+        # a restart during the feedback must not step the new run
+        self._cancel_next_step()
         self.is_locked = False
-        self.chapter_scores = [0 for _ in self.chapters]
         self.active_theme_index = None
+        self.theme.reset()
 
-        # XP reset (if you added XP tracking)
-        self.xp = 0
         game = self.sm.get_screen("game")
         game.player_name = self.player_name
         game.progress_value = 0
@@ -541,131 +560,67 @@ class AdventureApp(App):
         if hasattr(game, "xp_text"):
             game.xp_text = "0"
 
-        # ---- Build 10-question sets per chapter for this run ----
-        # Each chapter: random subset of its questions, max 10.
-        self.chapter_question_sets = []
-        for ch in self.chapters:
-            pool = ch["questions"][:]  # copy full list
-            random.shuffle(pool)  # shuffle in-place
-            self.chapter_question_sets.append(pool[:10])  # take first 10
-
     def start_game(self):
         welcome = self.sm.get_screen("welcome")
         name_input = welcome.ids.get("name_input")
         entered_name = name_input.text.strip() if name_input else ""
         self.player_name = entered_name if entered_name else "Player"
 
-        self.mode = "adventure"
         self.reset_state()
         self.sm.current = "game"
-        self.show_question()
+        self.engine.start_adventure()
 
     def start_daily_challenge(self):
-        # daily mode: 5 random questions across all chapters
-        self.mode = "daily"
+        # daily mode: today's 5 questions, the same on every device
         self.reset_state()
-        all_refs = self.get_all_question_refs()
-        random.shuffle(all_refs)
-        self.daily_questions = all_refs[:5]
-        self.daily_index = 0
         self.sm.current = "game"
-        self.show_question()
+        self.engine.start_daily()
 
-    def get_current_question(self):
-        # DAILY MODE: uses daily_questions index into full chapters list
-        if self.mode == "daily":
-            ci, qi = self.daily_questions[self.daily_index]
-            return self.chapters[ci]["questions"][qi]
-
-        # ADVENTURE MODE: use the prebuilt 10-question set for this chapter
-        chapter_questions = self.chapter_question_sets[self.chapter_index]
-
-        if self.question_index >= len(chapter_questions):
-            # Safety: clamp to last question instead of crashing
-            return chapter_questions[-1]
-
-        return chapter_questions[self.question_index]
-
-    def current_question_number(self):
-        if self.mode == "daily":
-            return self.daily_index + 1
-
-        # Adventure mode: count questions based on 10-question sets
-        n = 0
-        for i, _ in enumerate(self.chapters):
-            if i < self.chapter_index:
-                n += len(self.chapter_question_sets[i])
-        return n + self.question_index + 1
+    def start_review(self):
+        # review mode: missed questions that are due again
+        self.reset_state()
+        self.sm.current = "game"
+        self.engine.start_review()
 
     def show_question(self):
-        game = self.sm.get_screen("game")
-
-        # ----- mode-specific flow -----
-        if self.mode == "daily":
-            if not self.daily_questions or self.daily_index >= len(self.daily_questions):
-                self.finish_daily()
-                return
-
-            ci, qi = self.daily_questions[self.daily_index]
-            self.chapter_index = ci  # theme follows the chapter of the question
-            chapter = self.chapters[ci]
+        self.engine.show_question()
 
-        else:
-            # adventure mode
-            if self.chapter_index >= len(self.chapters):
-                self.finish_game()
-                return
-
-            chapter = self.chapters[self.chapter_index]
-            chapter_questions = self.chapter_question_sets[self.chapter_index]
-
-            # if we've exhausted the 10 for this chapter, move on
-            if self.question_index >= len(chapter_questions):
-                self.finish_chapter()
-                return
+    def on_engine_question(self, question, chapter, options, number, total):
+        game = self.sm.get_screen("game")
+        engine = self.engine
 
         # ----- apply theme based on current chapter -----
+        self.theme.begin_question()
         self.apply_chapter_theme()
-
-        # ----- get question -----
-        if self.mode == "daily":
-            ci, qi = self.daily_questions[self.daily_index]
-            q = self.chapters[ci]["questions"][qi]
-        else:
-            chapter_questions = self.chapter_question_sets[self.chapter_index]
-            q = chapter_questions[self.question_index]
+        Logger.debug(f"Theme: {self.theme.question_dispatches} property dispatches for this question")
 
         game.chapter_title = chapter["title"]
-        game.question_text = q["prompt"]
-
-        # shuffle answers visually but keep index mapping
-        options = list(q["options"])
-        indices = list(range(len(options)))
-        random.shuffle(indices)
-        game._option_map = indices
+        game.question_text = question["prompt"]
+        game._option_map = engine.option_map
 
-        game.option1_text = options[indices[0]]
-        game.option2_text = options[indices[1]]
-        game.option3_text = options[indices[2]]
-        game.option4_text = options[indices[3]]
+        game.option1_text = options[0]
+        game.option2_text = options[1]
+        game.option3_text = options[2]
+        game.option4_text = options[3]
+        # usually rendered already by prefetch_next()
+        self.install_label_textures(game, GAME_TEXT_LABELS)
 
         # ----- progress / HUD -----
-        question_number = self.current_question_number()
-        if self.mode == "daily":
-            total = len(self.daily_questions)
-            game.progress_max = total
-            game.progress_text = f"Daily Question {question_number} of {total}"
+        game.progress_max = total
+        if engine.mode == "daily":
+            game.progress_text = f"Daily Question {number} of {total}"
+        elif engine.mode == "review":
+            game.progress_text = f"Review Question {number} of {total}"
         else:
-            game.progress_max = self.total_questions
-            game.progress_text = f"Question {question_number} of {self.total_questions}"
+            game.progress_text = f"Question {number} of {total}"
 
-        game.progress_value = question_number
-        game.coins_text = str(self.coins)
+        game.progress_value = number
+        game.coins_text = str(engine.coins)
         if hasattr(game, "xp_text"):
-            game.xp_text = str(getattr(self, "xp", 0))
+            game.xp_text = str(engine.xp)
 
-        if self.mode == "adventure":
-            if self.question_index == 0 and question_number != 1:
+        if engine.mode == "adventure":
+            if engine.question_index == 0 and number != 1:
                 game.feedback_text = (
                     f"[b]New Chapter:[/b] {chapter['title']} — Your knowledge is getting better!"
                 )
@@ -675,80 +630,107 @@ class AdventureApp(App):
         else:
             if not game.feedback_text.startswith("[b]Fun Fact"):
                 game.feedback_text = ""
+        self.install_label_textures(game, ("feedback_lbl",))
 
         # ----- animations -----
+        self.dismiss_reward_popup()
+        tweens = self.tweens
         qlbl = game.ids.get("question_lbl")
         if qlbl:
             qlbl.opacity = 0
-            Animation(opacity=1, d=0.25).start(qlbl)
+            tweens.animate(qlbl, "opacity", 1, 0.25)
 
         for opt_id in ("opt1", "opt2", "opt3", "opt4"):
             btn = game.ids.get(opt_id)
             if btn:
+                # slide up to where the button rests, even if the last
+                # question's slide is still running
+                rest_y = tweens.final_value(btn, "y")
                 btn.opacity = 0
-                btn.y -= 10
-                Animation(opacity=1, y=btn.y + 10, d=0.25).start(btn)
+                btn.y = rest_y - 10
+                tweens.animate(btn, "opacity", 1, 0.25)
+                tweens.animate(btn, "y", rest_y, 0.25)
 
+        self.question_shown_at = time.perf_counter()
         self.is_locked = False
 
-    def check_achievements(self):
-        unlocks = []
-
-        if self.score == 5:
-            unlocks.append("First 5 Correct")
-        if self.score == 10:
-            unlocks.append("Rising Scholar")
-        if self.coins >= 100:
-            unlocks.append("Coin Collector")
-        if self.chapter_index == len(self.chapters) - 1:
-            unlocks.append("Chapter Master")
-
-        for title in unlocks:
-            self.show_achievement(title)
-
     def on_answer(self, visual_index, button_widget):
         if self.is_locked:
+            # rapid mode: a tap while the feedback is up goes straight on
+            if self.rapid_mode and self._next_step_event is not None:
+                self._next_step()
             return
         self.is_locked = True
+        self.answer_latency_ms = (time.perf_counter() - self.question_shown_at) * 1000.0
 
         self.animate_button_pulse(button_widget)
-        Clock.schedule_once(lambda dt: self._process_answer(visual_index), 0.15)
+        self._process_answer(visual_index)
 
     def _process_answer(self, visual_index):
-        game = self.sm.get_screen("game")
-        q = self.get_current_question()
-        game.xp_text = str(self.xp)
+        # scored, saved and shown now; the pulse plays on top of it
+        result = self.engine.answer(visual_index)
+
+        # get the next question ready while the feedback plays, off the
+        # frame that starts the feedback animations
+        self._prefetch_event = Clock.schedule_once(lambda dt: self._prefetch(), self.PREFETCH_DELAY)
 
-        original_index = game._option_map[visual_index]
-        correct_index = q["correct_index"]
+        # move directly to next question (Fun Facts removed)
+        correct_time, wrong_time = self.RAPID_FEEDBACK_TIME if self.rapid_mode else self.FEEDBACK_TIME
+        self._next_step_event = Clock.schedule_once(
+            lambda dt: self._next_step(), correct_time if result["correct"] else wrong_time
+        )
 
-        #Change the amount of Coins.
-        if original_index == correct_index:
-            reward = 25
-            xp_gain = q.get("xp", 10)
+    def toggle_rapid_mode(self):
+        self.rapid_mode = not self.rapid_mode
+        self.scores["rapid_mode"] = self.rapid_mode
+        self.save_scores()
 
-            self.score += 1
-            self.coins += reward
-            self.xp += xp_gain
+    def _prefetch(self):
+        self._prefetch_event = None
+        self.prefetch_next()
 
-            if self.mode == "adventure":
-                self.chapter_scores[self.chapter_index] += 1
+    def prefetch_next(self):
+        """Pick and shuffle the next question and render its texts
+        off-screen, so showing it is a property swap."""
+        prepared = self.engine.prefetch()
+        if prepared is None:
+            return None
+        question, options = prepared
+        game = self.sm.get_screen("game")
+        for label_id, text in zip(GAME_TEXT_LABELS, [question["prompt"], *options]):
+            label = game.ids.get(label_id)
+            if label is not None:
+                self.label_textures.prerender(label, text)
+        return prepared
+
+    def install_label_textures(self, screen, label_ids):
+        for label_id in label_ids:
+            label = screen.ids.get(label_id)
+            if label is not None:
+                self.label_textures.install(label)
+
+    def on_engine_answered(self, question, correct, reward, xp_gain, correct_word):
+        game = self.sm.get_screen("game")
+        engine = self.engine
 
-            game.feedback_text = "[color=00ffbf]Correct! +25 coins[/color]"
+        # buffered; written on the log's own thread
+        self.answer_log.record(
+            question["id"], engine.chapter_index, question.get("difficulty"),
+            correct, self.answer_latency_ms, engine.mode,
+        )
+        # the engine already updated the ability estimate; write it soon
+        self.player_store.save()
+
+        if correct:
+            game.feedback_text = f"[color=00ffbf]Correct! +{reward} coins[/color]"
             self.play_correct_sound()
-            self.check_achievements()
 
-            self.show_reward_popup(reward)
+            self.notifications.post_reward(reward)
             self.animate_coin_hud(reward)
             self.animate_coin_fly(reward)
 
-            game.coins_text = str(self.coins)
-            game.xp_text = str(self.xp)
-
-
-
+            game.xp_text = str(engine.xp)
         else:
-            correct_word = q["options"][correct_index]
             game.feedback_text = (
                 f"[color=ff6b6b]Not quite![/color] "
                 f"Correct word: [b]{correct_word}[/b]"
@@ -757,23 +739,12 @@ class AdventureApp(App):
             for opt_id in ("opt1", "opt2", "opt3", "opt4"):
                 self._shake_widget(game.ids.get(opt_id))
 
-        game.coins_text = str(self.coins)
+        game.coins_text = str(engine.coins)
+        # "Correct! +25 coins" and friends come back all the time
+        self.install_label_textures(game, ("feedback_lbl",))
 
-        # show fun fact popup then move on
-        # move directly to next question (Fun Facts removed)
-        Clock.schedule_once(lambda dt: self._next_step(), 0.9)
-
-    def get_daily_bonus(self):
-        streak = self.scores.get("daily_streak", 1)
-        return min(streak * 10, 100)  # cap at 100 bonus coins
-
-    def get_reward(self, difficulty):
-        rewards = {
-            "easy": (15, 10),
-            "medium": (25, 15),
-            "hard": (50, 30)
-        }
-        return rewards.get(difficulty, (20, 10))
+    def on_engine_achievement(self, title):
+        self.notifications.post_achievement(title)
 
     def animate_coin_hud(self, gained):
         """Quick pop animation on the coins label when coins are earned."""
@@ -782,29 +753,25 @@ class AdventureApp(App):
         if not lbl:
             return
 
-        # Small size pop
-        try:
-            base_size = float(lbl.font_size)
-        except Exception:
-            base_size = 20.0
+        # Small size pop from the resting size, so a pop that starts
+        # mid-animation does not grow the label
+        base_size = self.tweens.final_value(lbl, "font_size")
+        self.tweens.chain(lbl, "font_size", [(base_size * 1.25, 0.10, "linear"),
+                                             (base_size, 0.10, "linear")])
 
-        pop_up = Animation(font_size=base_size * 1.25, d=0.10)
-        pop_down = Animation(font_size=base_size, d=0.10)
-        (pop_up + pop_down).start(lbl)
+    def _make_coin_fly(self):
+        return Image(color=(1, 0.9, 0.2, 1), size_hint=(None, None))
+
+    def _reset_coin_fly(self, fly):
+        fly.opacity = 1
 
     def animate_coin_fly(self, amount):
         game = self.sm.get_screen("game")
 
-        # Create floating coin text
-        fly = Label(
-            text=f"+{amount}",
-            font_size=52,
-            bold=True,
-            color=(1, 0.9, 0.2, 1),
-            size_hint=(None, None)
-        )
-        fly.texture_update()
-        fly.size = fly.texture_size
+        # Floating coin text from the pool, with a pre-rendered texture
+        fly = self.coin_fly_pool.acquire()
+        fly.texture = self.coin_textures.get(f"+{amount}")
+        fly.size = fly.texture.size
 
         # Add to screen
         game.add_widget(fly)
@@ -823,111 +790,82 @@ class AdventureApp(App):
             target_x = game.width - 80
             target_y = game.height - 60
 
-        # Animate fly → HUD
-        anim = (
-                Animation(pos=(target_x, target_y), d=0.6, t="out_quad") &
-                Animation(opacity=0, d=0.6)
-        )
+        # Animate fly → HUD; the widget goes back to the pool when it lands
+        self.tweens.animate(fly, "x", target_x, 0.6, "out_quad")
+        self.tweens.animate(fly, "y", target_y, 0.6, "out_quad")
+        self.tweens.animate(fly, "opacity", 0, 0.6, on_complete=self.coin_fly_pool.release)
 
-        def cleanup(*_):
-            game.remove_widget(fly)
-
-        anim.bind(on_complete=cleanup)
-        anim.start(fly)
+    def _cancel_next_step(self):
+        # a prefetch still waiting would be for a slot that has moved on
+        if self._prefetch_event is not None:
+            self._prefetch_event.cancel()
+            self._prefetch_event = None
+        if self._next_step_event is not None:
+            self._next_step_event.cancel()
+            self._next_step_event = None
 
     def _next_step(self):
-        # ----- DAILY MODE -----
-        if self.mode == "daily":
-            if self.daily_index < len(self.daily_questions) - 1:
-                self.daily_index += 1
-                self.show_question()
-            else:
-                self.finish_daily()
-            return
-
-        # ----- ADVENTURE MODE -----
-        chapter_questions = self.chapter_question_sets[self.chapter_index]
-
-        if self.question_index < len(chapter_questions) - 1:
-            self.question_index += 1
-            self.show_question()
-        else:
-            # finished this chapter's 10 questions
-            self.finish_chapter()
+        # also reached early by a rapid-mode tap
+        self._cancel_next_step()
+        self.engine.next_step()
 
     def animate_button_pulse(self, widget):
-        anim1 = Animation(opacity=0.6, d=0.08)
-        anim2 = Animation(opacity=1.0, d=0.08)
-        (anim1 + anim2).start(widget)
+        self.tweens.chain(widget, "opacity", [(0.6, 0.08, "linear"), (1.0, 0.08, "linear")])
 
     def _shake_widget(self, widget):
         if not widget:
             return
-        x = widget.x
-        (Animation(x=x - 8, d=0.05) +
-         Animation(x=x + 8, d=0.05) +
-         Animation(x=x, d=0.05)).start(widget)
-
-    def finish_chapter(self):
-        chapter = self.chapters[self.chapter_index]
-        chapter_title = chapter["title"]
-
-        # use limited 10-question set
-        chapter_questions = self.chapter_question_sets[self.chapter_index]
-        chapter_total = len(chapter_questions)
-        chapter_correct = self.chapter_scores[self.chapter_index]
-        chapter_accuracy = (
-            (chapter_correct / chapter_total) * 100.0 if chapter_total else 0.0
-        )
-
-        question_number = self.current_question_number()
-
+        # around the resting x, so a second shake cannot walk the button
+        x = self.tweens.final_value(widget, "x")
+        self.tweens.chain(widget, "x", [(x - 8, 0.05, "linear"),
+                                        (x + 8, 0.05, "linear"),
+                                        (x, 0.05, "linear")])
+
+    def on_chapter_finished(self, summary):
+        engine = self.engine
         chapter_end = self.sm.get_screen("chapter_end")
-        chapter_end.chapter_title = chapter_title
+        chapter_end.chapter_title = summary["chapter"]["title"]
         chapter_end.chapter_result = (
-            f"Correct in this chapter: [b]{chapter_correct}[/b] / {chapter_total}"
+            f"Correct in this chapter: [b]{summary['correct']}[/b] / {summary['total']}"
         )
-        chapter_end.chapter_accuracy = f"Chapter accuracy: [b]{chapter_accuracy:.0f}%[/b]"
-        chapter_end.coins_text = str(self.coins)
+        chapter_end.chapter_accuracy = f"Chapter accuracy: [b]{summary['accuracy']:.0f}%[/b]"
+        chapter_end.coins_text = str(summary["coins"])
         chapter_end.overall_progress = (
-            f"Overall progress: Question {question_number} of {self.total_questions}"
+            f"Overall progress: Question {summary['question_number']} of {engine.total_questions}"
         )
 
-        if self.chapter_index == len(self.chapters) - 1:
-            self.finish_game()
-        else:
+        # the last chapter goes straight on to the end screen
+        if not summary["last"]:
             self.sm.current = "chapter_end"
 
     def continue_to_next_chapter(self):
-        self.chapter_index += 1
-        self.question_index = 0
         self.is_locked = False
         self.sm.current = "game"
-        self.show_question()
+        self.engine.continue_to_next_chapter()
 
     def back_to_welcome_from_chapter(self):
+        self.engine.reset()
         self.reset_state()
         self.sm.current = "welcome"
 
-    def finish_game(self):
-        total_questions = self.total_questions or 1
-        accuracy = (self.score / total_questions) * 100.0
-        accuracy_str = f"{accuracy:.0f}%"
+    def on_game_finished(self, summary):
+        accuracy_str = f"{summary['accuracy']:.0f}%"
 
         end = self.sm.get_screen("end")
         end.result_title = "Black Excellence Word Adventure has been Completed!"
         end.result_summary = (
             f"[b]{self.player_name}[/b], you journeyed through all 8 chapters.\n\n"
-            f"Correct answers: [b]{self.score}[/b] / {total_questions}\n"
+            f"Correct answers: [b]{summary['score']}[/b] / {summary['total']}\n"
             f"Accuracy: [b]{accuracy_str}[/b]"
         )
-        end.coins_text = str(self.coins)
+        end.coins_text = str(summary["coins"])
         end.chapter_message = (
             "You’ve cleared the entire Black Excellence Knowledge Adventure.\n"
             "Keep exploring, keep learning, keep shining."
         )
 
-        self.update_scores(self.score, accuracy, self.coins)
+        self.save_scores()
+        self.review_deck.save()
 
         best_score = self.scores.get("best_score", 0)
         best_accuracy = self.scores.get("best_accuracy", 0.0)
@@ -943,61 +881,47 @@ class AdventureApp(App):
 
         self.sm.current = "end"
 
-    def finish_daily(self):
-        total = len(self.daily_questions) or 1
-        accuracy = (self.score / total) * 100.0
-
-        today_str = date.today().isoformat()
-        last = self.scores.get("last_daily_date", "")
-
-        if last == today_str:
-            # already logged today; keep streak as-is
-            pass
-        else:
-            if last:
-                last_date = date.fromisoformat(last)
-                delta = (date.today() - last_date).days
-                if delta == 1:
-                    self.scores["daily_streak"] = self.scores.get("daily_streak", 0) + 1
-                else:
-                    self.scores["daily_streak"] = 1
-            else:
-                self.scores["daily_streak"] = 1
-            self.scores["last_daily_date"] = today_str
-
-        # update coins & global stats
-        self.scores["total_coins_earned"] = (
-            self.scores.get("total_coins_earned", 0) + self.coins
-        )
-        self.scores["coin_balance"] = (
-            self.scores.get("coin_balance", 0) + self.coins
-        )
-        self.scores["total_correct_all_time"] = (
-            self.scores.get("total_correct_all_time", 0) + self.score
-        )
-        self.scores["total_questions_all_time"] = (
-            self.scores.get("total_questions_all_time", 0) + total
-        )
-        self.scores["max_coins_single_run"] = max(
-            self.scores.get("max_coins_single_run", 0),
-            self.coins,
-        )
+    def on_daily_finished(self, summary):
         self.save_scores()
+        self.review_deck.save()
 
         scr = self.sm.get_screen("daily_end")
+        scr.title_text = "Daily Challenge Complete!"
         scr.result_text = (
             f"Daily Challenge Complete!\n\n"
-            f"Correct: {self.score} / {total}\n"
-            f"Accuracy: {accuracy:.0f}%"
+            f"Correct: {summary['score']} / {summary['total']}\n"
+            f"Accuracy: {summary['accuracy']:.0f}%"
         )
-        bonus = self.get_daily_bonus()
-        self.coins += bonus
-        self.scores["coin_balance"] += bonus
+        scr.result_text += f"\n\nDaily Bonus: +{summary['bonus']} coins"
 
-        scr.result_text += f"\n\nDaily Bonus: +{bonus} coins"
+        scr.coins_text = str(summary["coins"])
+        scr.streak_text = f"Current Daily Streak: {summary['streak']} days"
 
-        scr.coins_text = str(self.coins)
-        scr.streak_text = f"Current Daily Streak: {self.scores.get('daily_streak', 0)} days"
+        self.sm.current = "daily_end"
+
+    def on_review_finished(self, summary):
+        self.save_scores()
+        self.review_deck.save()
+
+        scr = self.sm.get_screen("daily_end")
+        scr.title_text = "Review Complete!"
+        if summary["total"]:
+            scr.result_text = (
+                f"Correct: {summary['score']} / {summary['total']}\n"
+                f"Accuracy: {summary['accuracy']:.0f}%"
+            )
+        else:
+            scr.result_text = "No missed questions are due for review right now."
+
+        next_due = summary["next_due"]
+        if next_due is None:
+            scr.streak_text = ""
+        else:
+            hours = max(0.0, next_due - time.time()) / 3600.0
+            scr.streak_text = (
+                "More reviews are due now" if hours < 1 else f"Next review due in {hours:.0f} hours"
+            )
+        scr.coins_text = str(summary["coins"])
 
         self.sm.current = "daily_end"
 
@@ -1023,9 +947,27 @@ class AdventureApp(App):
             f"Average Accuracy: {avg_acc:.0f}%\n"
             f"Total Coins Earned: {total_coins_all}\n"
             f"Coin Balance: {coin_balance}\n"
-            f"Daily Streak: {streak} days"
+            f"Daily Streak: {streak} days\n"
+            f"Skill Rating: {self.player_model.rating:.0f}"
         )
 
+        # per-difficulty / per-chapter accuracy straight from the aggregates
+        log = self.answer_log
+        by_difficulty = [
+            f"{d.capitalize()} {acc:.0f}%"
+            for d in question_bank.DIFFICULTIES
+            if (acc := log.accuracy("difficulty", d)) is not None
+        ]
+        by_chapter = [
+            f"Ch{ci + 1} {acc:.0f}%"
+            for ci in range(len(self.chapters))
+            if (acc := log.accuracy("chapters", ci)) is not None
+        ]
+        if by_difficulty:
+            scr.stats_text += "\nBy difficulty: " + "  ".join(by_difficulty)
+        if by_chapter:
+            scr.stats_text += "\nBy chapter: " + "  ".join(by_chapter)
+
         self.sm.current = "profile"
 
     def open_skins(self):
@@ -1074,14 +1016,74 @@ class AdventureApp(App):
 
     def play_again(self):
         # default: restart adventure mode
-        self.mode = "adventure"
         self.reset_state()
         self.sm.current = "game"
-        self.show_question()
+        self.engine.start_adventure()
+
+    def on_start(self):
+        if self.profiler:
+            self.profiler.show_overlay()
+        if STARTUP:
+            STARTUP.mark("start")
+            STARTUP.report_after_first_frame(self.window)
+        # build the other screens after the first frames, game screen first
+        self.sm.build_idle(order=("game", "chapter_end", "end"), delay=0.5)
+        self.review_deck.preload()
+        self.governor.start(self.window)
+
+    def flush_stores(self):
+        self.store.flush()
+        self.player_store.flush()
+        self.review_deck.save()
+        self.review_deck.store.flush()
+        self.daily_set.store.flush()
+        self.answer_log.flush()
+
+    def on_pause(self):
+        # in the background: nothing to draw, nothing to hear, and the
+        # OS may kill us without on_stop, so write everything now
+        self.governor.suspend()
+        self._paused_music = self.audio.suspend()
+        self.flush_stores()
+        self.label_textures.clear()
+        self.backgrounds.clear()
+        if self.sm.is_built("game"):
+            # drop the screen's reference too so the texture can go
+            self.theme.push(self.sm.get_screen("game"), "bg_texture", None)
+        return True
+
+    def on_resume(self):
+        self.governor.resume()
+        if self.sm.is_built("game"):
+            game = self.sm.get_screen("game")
+            if game.bg_source:
+                # decoded off the UI thread; the background is put back when
+                # it is ready rather than stalling the first frame back
+                path = game.bg_source
+                self.backgrounds.preload(path, lambda texture: self._restore_background(path, texture))
+        # the track that was playing and the chapter's effects reload on the
+        # audio thread; the music starts again once it is loaded
+        self.audio.resume(self._paused_music, (self.sfx_correct, self.sfx_wrong))
+        self._paused_music = None
+        self.preload_upcoming_assets()
+
+    def _restore_background(self, path, texture):
+        game = self.sm.get_screen("game")
+        # skip it if the chapter changed meanwhile
+        if texture is not None and game.bg_source == path:
+            self.theme.push(game, "bg_texture", texture)
+
+    def on_stop(self):
+        self.flush_stores()
+        textures = self.label_textures.stats()
+        Logger.info(f"Labels: texture cache {textures['hit_rate']:.0%} hits, "
+                    f"{textures['entries']} textures, {textures['bytes'] / 2 ** 20:.1f} MB, "
+                    f"{textures['evictions']} evicted")
+        if self.profiler:
+            self.profiler.dump(os.path.join(os.path.dirname(__file__), "profile_trace.json"))
 
     def quit_app(self):
-        if self.bg_music:
-            self.bg_music.stop()
+        self.audio.stop_music()
         self.stop()
 
 
@@ -0,0 +1,78 @@
+"""Queue for reward and achievement overlays.
+
+Correct answers can arrive faster than their popups play out, and a single
+answer can unlock several achievements. Instead of opening a popup per
+event, events are queued: rewards posted while one is still waiting are
+added into a single "+N Coins" popup, achievements waiting together are
+shown as one popup listing all titles, and only a bounded number of
+overlays (at most one of each kind) is on screen at any time.
+"""
+from collections import deque
+
+from kivy.clock import Clock
+
+REWARD = "reward"
+ACHIEVEMENT = "achievement"
+
+
+class NotificationScheduler:
+    def __init__(self, show, max_visible=2, merge_window=0.15):
+        # show(kind, payload) opens the overlay; the caller reports
+        # finished(kind) once it is gone
+        self.show = show
+        self.max_visible = max_visible
+        self._queue = deque()        # [kind, payload] waiting to be shown
+        self._visible = set()
+        self._pump = Clock.create_trigger(lambda dt: self.pump(), merge_window)
+        self.posted = 0
+        self.shown = 0
+
+    def _pending(self, kind):
+        for item in self._queue:
+            if item[0] == kind:
+                return item
+        return None
+
+    def post_reward(self, coins):
+        self.posted += 1
+        item = self._pending(REWARD)
+        if item:
+            item[1] += coins
+        else:
+            self._queue.append([REWARD, coins])
+        self._pump()
+
+    def post_achievement(self, title):
+        self.posted += 1
+        item = self._pending(ACHIEVEMENT)
+        if item:
+            if title not in item[1]:
+                item[1].append(title)
+        else:
+            self._queue.append([ACHIEVEMENT, [title]])
+        self._pump()
+
+    def pump(self):
+        for item in list(self._queue):
+            if len(self._visible) >= self.max_visible:
+                break
+            kind, payload = item
+            if kind in self._visible:
+                continue
+            self._queue.remove(item)
+            self._visible.add(kind)
+            self.shown += 1
+            self.show(kind, payload)
+
+    def finished(self, kind):
+        self._visible.discard(kind)
+        if self._queue:
+            self._pump()
+
+    def clear(self):
+        self._queue.clear()
+        self._pump.cancel()
+
+    def stats(self):
+        return {"posted": self.posted, "shown": self.shown,
+                "queued": len(self._queue), "visible": len(self._visible)}
@@ -0,0 +1,261 @@
+"""Content packs.
+
+A pack is a directory or a .zip in packs/ laid out as
+
+    manifest.json
+    chapters/<name>.json     JSON array of question objects
+    images/..., audio/...    theme assets
+
+with a manifest like
+
+    {
+      "id": "space",
+      "title": "Black Excellence in Space",
+      "version": 1,
+      "order": 10,
+      "chapters": [
+        {
+          "title": "Astronauts",
+          "file": "chapters/astronauts.json",
+          "questions": 12,
+          "theme": {"bg_image": "images/astronauts.jpg", "music": "audio/loop.mp3",
+                    "button_color": [0.3, 0.8, 1.0, 1]},
+          "meta": [[id, difficulty, xp, tags], ...]
+        }
+      ]
+    }
+
+Packs are looked for in the app's packs/ and in packs/ under the user data
+directory, where downloaded packs go. Only manifests are read at startup. A
+chapter's file is streamed question by question with an incremental parser
+the first time the chapter is played. Zipped theme assets are extracted to
+a cache directory by the background and audio loader threads (see
+extract()) the first time they are loaded. "meta" is optional precomputed index data (ids,
+difficulty, xp, tags); without it the chapter's index entries are filled in
+when the chapter is first loaded.
+"""
+import io
+import json
+import os
+import threading
+import zipfile
+
+from kivy.logger import Logger
+
+from question_bank import DIFFICULTIES, NO_DIFFICULTY, LazyChapter, question_id
+
+ASSET_KEYS = ("bg_image", "music", "sfx_correct", "sfx_wrong")
+
+# cache path -> (pack, rel) of zipped assets handed out but not extracted yet
+_unextracted = {}
+_extract_lock = threading.Lock()
+
+
+def extract(path):
+    """Extract a zipped pack asset to its cache path if that has not
+    happened yet; other paths are left alone. Called by the loader threads
+    right before they read a file."""
+    with _extract_lock:
+        entry = _unextracted.pop(path, None)
+        if entry is not None:
+            pack, rel = entry
+            pack.asset(rel)
+    return path
+
+
+def iter_array(f, chunk_size=64 * 1024):
+    """Yield the objects of a JSON array of objects from a binary file,
+    reading it in chunks instead of parsing the whole document."""
+    decoder = json.JSONDecoder()
+    reader = io.TextIOWrapper(f, encoding="utf-8-sig")
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+
+    skip_ws()
+    if pos < len(buf) and buf[pos] == "]":
+        return
+    while True:
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "{":
+            raise ValueError(f"expected an object at character {pos}")
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        yield obj
+        pos = end
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError("unterminated JSON array")
+        if buf[pos] == "]":
+            return
+        if buf[pos] != ",":
+            raise ValueError(f"expected ',' or ']' at character {pos}")
+        pos += 1
+        # drop what has been parsed
+        buf = buf[pos:]
+        pos = 0
+
+
+class PackTheme(dict):
+    """Chapter theme whose asset paths are resolved when they are read.
+    Zipped assets are only extracted once a loader asks for them."""
+
+    def __init__(self, pack, theme):
+        super().__init__(theme)
+        self.pack = pack
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key in ASSET_KEYS and value:
+            return self.pack.asset_path(value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+class ContentPack:
+    def __init__(self, path, cache_dir):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path) if os.path.isfile(path) else False
+        self._zip = None
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.cache_dir = os.path.join(cache_dir, name)
+        with self.open("manifest.json") as f:
+            self.manifest = json.load(f)
+        self.id = self.manifest.get("id", name)
+        self.title = self.manifest.get("title", self.id)
+        self.order = self.manifest.get("order", 0)
+        self.version = self.manifest.get("version", 0)
+
+    def open(self, rel):
+        if self.is_zip:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+            return self._zip.open(rel)
+        return open(os.path.join(self.path, rel), "rb")
+
+    def asset_path(self, rel):
+        """Where `rel` is on disk, without extracting it."""
+        if not self.is_zip:
+            return os.path.join(self.path, rel)
+        target = os.path.join(self.cache_dir, rel)
+        with _extract_lock:
+            _unextracted[target] = (self, rel)
+        return target
+
+    def asset(self, rel):
+        """Path of `rel`, extracted from the zip first if the cached copy
+        is missing or older than the pack."""
+        if not self.is_zip:
+            return os.path.join(self.path, rel)
+        target = os.path.join(self.cache_dir, rel)
+        if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(self.path):
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp = target + ".tmp"
+                with self.open(rel) as src, open(tmp, "wb") as dst:
+                    while True:
+                        block = src.read(256 * 1024)
+                        if not block:
+                            break
+                        dst.write(block)
+                os.replace(tmp, target)
+            except (OSError, KeyError) as e:
+                Logger.warning(f"Packs: {self.id}: missing asset {rel}: {e}")
+        return target
+
+    def load_chapter(self, rel, count):
+        questions = []
+        with self.open(rel) as f:
+            for q in iter_array(f):
+                q["id"] = question_id(q["prompt"])
+                questions.append(q)
+        if len(questions) != count:
+            # the index was sized from the manifest
+            Logger.warning(f"Packs: {self.id}: {rel} has {len(questions)} questions, "
+                           f"manifest says {count}")
+        return questions
+
+    def chapters(self, index):
+        """LazyChapters for this pack, registered in `index` after the
+        chapters already in it."""
+        chapters = []
+        for entry in self.manifest.get("chapters", []):
+            ci = len(index.chapter_start)
+            count = entry.get("questions", 0)
+            meta = entry.get("meta")
+            index.begin_chapter(ci)
+            if meta and len(meta) == count:
+                for qi, (qid, difficulty, xp, tags) in enumerate(meta):
+                    code = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else NO_DIFFICULTY
+                    index.add(ci, qi, qid, code, xp, tags)
+                loader = (lambda rel=entry["file"], count=count: self.load_chapter(rel, count))
+            else:
+                # counts only: fill the index in once the chapter is read
+                index.reserve(ci, count)
+
+                def loader(rel=entry["file"], ci=ci, count=count):
+                    questions = self.load_chapter(rel, count)
+                    index.fill_chapter(ci, questions)
+                    return questions
+
+            chapter = LazyChapter(entry["title"], count, loader=loader)
+            if entry.get("theme"):
+                chapter["theme"] = PackTheme(self, entry["theme"])
+            chapters.append(chapter)
+        return chapters
+
+
+def discover(packs_dirs, cache_dir):
+    """Packs under the `packs_dirs`, ordered by manifest "order" then id.
+    Only the manifests are read. When two directories have a pack with the
+    same id, the higher manifest "version" wins, the later directory on a
+    tie."""
+    found = {}
+    for packs_dir in packs_dirs:
+        try:
+            names = sorted(os.listdir(packs_dir))
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(packs_dir, name)
+            if not (os.path.isdir(path) or name.endswith(".zip")):
+                continue
+            try:
+                pack = ContentPack(path, cache_dir)
+            except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+                Logger.warning(f"Packs: skipping {name}: {e}")
+                continue
+            other = found.get(pack.id)
+            if other is None or pack.version >= other.version:
+                found[pack.id] = pack
+    return sorted(found.values(), key=lambda p: (p.order, p.id))
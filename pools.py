@@ -0,0 +1,228 @@
+"""Pools for the short-lived widgets shown on every correct answer.
+
+The coin "+25" that flies to the HUD and the reward popup used to be built
+from scratch (with a synchronous text render) for every correct answer and
+then dropped, which fed the garbage collector right in the middle of the
+animations. Widgets are now taken from a pool and handed back when their
+animation ends, and the fly-up text is rendered once per value into a
+texture that is shared by every widget showing it.
+
+LabelTextureCache does the same for the game screen's question, option and
+feedback labels: their texts come back across questions and runs, so the
+rendered textures are kept (within a memory budget) and installed on the
+labels instead of the labels rendering them again. Upcoming texts can be
+rendered into it ahead of time while the app is idle.
+"""
+from collections import OrderedDict
+
+from kivy.core.text import Label as CoreLabel
+from kivy.core.text.markup import MarkupLabel as CoreMarkupLabel
+from kivy.utils import get_hex_from_color
+
+
+def _hashable(value):
+    # kivy list / dict properties (ObservableList, ObservableDict) as tuples
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+class WidgetPool:
+    def __init__(self, factory, reset=None, limit=8):
+        self.factory = factory
+        self.reset = reset
+        self.limit = limit
+        self._free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        if self._free:
+            self.reused += 1
+            return self._free.pop()
+        self.created += 1
+        return self.factory()
+
+    def release(self, widget):
+        if widget.parent is not None:
+            widget.parent.remove_widget(widget)
+        if self.reset:
+            self.reset(widget)
+        # beyond the limit the widget is simply dropped
+        if len(self._free) < self.limit and widget not in self._free:
+            self._free.append(widget)
+
+    def prefill(self, n):
+        while len(self._free) < min(n, self.limit):
+            self.created += 1
+            self._free.append(self.factory())
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "free": len(self._free)}
+
+
+class TextTextures:
+    """Text rendered once per string into a shared texture."""
+
+    def __init__(self, **label_options):
+        self.label_options = label_options
+        self._textures = {}
+
+    def get(self, text):
+        texture = self._textures.get(text)
+        if texture is None:
+            label = CoreLabel(text=text, **self.label_options)
+            label.refresh()
+            texture = label.texture
+            self._textures[text] = texture
+        return texture
+
+    def prerender(self, texts):
+        for text in texts:
+            self.get(text)
+
+
+class LabelTextureCache:
+    """Rendered label textures keyed by the text and every setting that
+    affects the render (font, size, markup, text_size, color, ...).
+
+    Bounded by texture memory, with segmented LRU eviction: a texture
+    enters a probation segment and moves to the protected one when it is
+    used again. A run through new prompts then only cycles the probation
+    segment, and the strings that keep coming back (feedback lines,
+    options shared between questions, the current session's questions on
+    a replay) stay cached however large the bank is.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, protected_share=0.8):
+        self.max_bytes = max_bytes
+        self.max_protected = int(max_bytes * protected_share)
+        self._probation = OrderedDict()    # key -> (texture, refs, anchors), oldest first
+        self._protected = OrderedDict()
+        self.probation_bytes = 0
+        self.protected_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(label, text):
+        # what Label._create_label passes to the core label; some of it is
+        # mutable (padding and text_size lists, the ellipsis_options dict)
+        values = [text, label.disabled]
+        for name in label._font_properties:
+            if name != "text":
+                values.append(_hashable(getattr(label, name)))
+        return tuple(values)
+
+    @staticmethod
+    def _size(entry):
+        texture = entry[0]
+        return texture.width * texture.height * 4
+
+    def _lookup(self, label, text):
+        # (texture, refs, anchors), or None for blank text
+        if not text.strip():
+            return None
+        key = self._key(label, text)
+        entry = self._protected.get(key)
+        if entry is not None:
+            self._protected.move_to_end(key)
+            self.hits += 1
+            return entry
+        entry = self._probation.pop(key, None)
+        if entry is not None:
+            # second use: promote
+            self.hits += 1
+            self.probation_bytes -= self._size(entry)
+            self._protected[key] = entry
+            self.protected_bytes += self._size(entry)
+            self._evict()
+            return entry
+
+        self.misses += 1
+        entry = self._render(label, text)
+        if entry[0] is not None:
+            self._probation[key] = entry
+            self.probation_bytes += self._size(entry)
+            self._evict()
+        return entry
+
+    @staticmethod
+    def _render(label, text):
+        # the same steps as Label._create_label and Label.texture_update
+        options = {name: getattr(label, name) for name in label._font_properties}
+        if label.disabled:
+            options["color"] = label.disabled_color
+            options["outline_color"] = label.disabled_outline_color
+        if not label.markup:
+            options["text"] = text
+            core = CoreLabel(**options)
+            core.refresh()
+            # like Label.texture_update: upload now, not at the first draw
+            if core.texture is not None:
+                core.texture.bind()
+            return core.texture, {}, {}
+        if label.halign == "justify" or label.strip:
+            text = text.strip()
+        options["text"] = "".join(("[color=", get_hex_from_color(options["color"]), "]", text, "[/color]"))
+        core = CoreMarkupLabel(**options)
+        core.refresh()
+        # refs and anchors are filled in when the texture is first bound
+        if core.texture is not None:
+            core.texture.bind()
+        return core.texture, core.refs, core.anchors
+
+    def get(self, label, text):
+        """Texture of `text` as `label` would render it; None for blank text."""
+        entry = self._lookup(label, text)
+        return entry[0] if entry is not None else None
+
+    def _evict(self):
+        # protected overflow is demoted, not dropped
+        while self.protected_bytes > self.max_protected and len(self._protected) > 1:
+            key, entry = self._protected.popitem(last=False)
+            self.protected_bytes -= self._size(entry)
+            self._probation[key] = entry
+            self.probation_bytes += self._size(entry)
+        while self.probation_bytes + self.protected_bytes > self.max_bytes and self._probation:
+            _key, entry = self._probation.popitem(last=False)
+            self.probation_bytes -= self._size(entry)
+            self.evictions += 1
+
+    def prerender(self, label, text):
+        self._lookup(label, text)
+
+    def install(self, label):
+        """Show `label`'s current text from the cache instead of letting the
+        label render it on the next frame."""
+        entry = self._lookup(label, label.text)
+        if entry is None or entry[0] is None:
+            return
+        texture, refs, anchors = entry
+        # the text change queued a render; this texture replaces it
+        label._trigger_texture.cancel()
+        label.texture = texture
+        label.texture_size = list(texture.size)
+        if label.markup:
+            label.refs = refs
+            label.anchors = anchors
+
+    def clear(self):
+        self._probation.clear()
+        self._protected.clear()
+        self.probation_bytes = 0
+        self.protected_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._probation) + len(self._protected),
+            "bytes": self.probation_bytes + self.protected_bytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
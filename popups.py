@@ -0,0 +1,21 @@
+"""Popup classes, registered with the Factory by module name in main.py so
+that this module, ModalView and AnchorLayout are only imported when the
+first popup is built. ModalView itself only reaches for the window when a
+popup is opened."""
+from kivy.properties import StringProperty
+from kivy.uix.modalview import ModalView
+
+
+class RewardPopup(ModalView):
+    """Shown over the game while play goes on: unlike a ModalView it takes
+    no touches, so they reach the screen underneath."""
+    reward_text = StringProperty("")
+
+    def on_touch_down(self, touch):
+        return False
+
+    def on_touch_move(self, touch):
+        return False
+
+    def on_touch_up(self, touch):
+        return False
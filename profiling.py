@@ -0,0 +1,231 @@
+"""Opt-in frame-time and hot-path instrumentation.
+
+Enable with the BE_PROFILE=1 environment variable. The profiler then
+
+- times the app's hot-path methods and the Clock callbacks the app
+  schedules, recording them as Chrome trace events,
+- measures every frame, counting dropped frames and tracking live
+  Animation, tween and widget counts,
+- shows a small on-screen overlay with those numbers, and
+- writes profile_trace.json (open in chrome://tracing or Perfetto) when the
+  app stops.
+
+Startup is profiled separately with `python main.py --profile-startup`,
+which logs how long each startup phase took (StartupTimer).
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.logger import Logger
+from kivy.uix.label import Label
+
+# modules whose Clock callbacks get timed; kivy's own are left alone so
+# Clock.unschedule(callback) inside kivy keeps working
+APP_MODULES = {"main", "__main__", "engine", "assets", "audio", "theme", "storage", "events", "tween"}
+
+APP_METHODS = (
+    "show_question", "on_engine_question", "on_answer", "_process_answer",
+    "on_engine_answered", "_next_step", "prefetch_next", "apply_chapter_theme",
+    "preload_upcoming_assets", "show_notification", "show_reward_popup", "show_achievement",
+    "animate_coin_hud", "animate_coin_fly", "animate_button_pulse",
+    "_shake_widget", "on_chapter_finished", "on_game_finished",
+    "on_daily_finished", "on_review_finished", "open_profile", "open_skins", "save_scores",
+)
+
+
+def enabled():
+    return os.environ.get("BE_PROFILE", "") not in ("", "0")
+
+
+def count_widgets(widget):
+    n = 1
+    stack = list(widget.children)
+    while stack:
+        w = stack.pop()
+        n += 1
+        stack.extend(w.children)
+    return n
+
+
+class StartupTimer:
+    """Durations of consecutive startup phases, each ending at mark()."""
+
+    def __init__(self, start):
+        self.start = start
+        self.phases = []
+        self._last = start
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report_after_first_frame(self, window):
+        def on_flip(*_):
+            window.unbind(on_flip=on_flip)
+            self.mark("first_frame")
+            self.report()
+
+        window.bind(on_flip=on_flip)
+
+    def report(self):
+        total = self._last - self.start
+        for phase, seconds in self.phases:
+            Logger.info(f"Startup: {phase:<12} {seconds * 1000:8.1f} ms")
+        Logger.info(f"Startup: {'total':<12} {total * 1000:8.1f} ms")
+
+
+class Profiler:
+    def __init__(self, target_fps=60, max_events=200000):
+        self.frame_budget = 1.0 / target_fps
+        self.max_events = max_events
+        self.events = []
+        self.frames = 0
+        self.dropped_frames = 0
+        self.frame_times = []
+        self._t0 = time.perf_counter()
+        self._last_frame = None
+        self._pid = os.getpid()
+        self.window = None
+        self.label_textures = None
+        self.tweens = None
+        self.governor = None
+        self.overlay = None
+
+    # -------- trace events --------
+    def _us(self, t):
+        return (t - self._t0) * 1e6
+
+    def record(self, name, cat, start, end):
+        if len(self.events) < self.max_events:
+            self.events.append({
+                "name": name, "cat": cat, "ph": "X",
+                "ts": self._us(start), "dur": (end - start) * 1e6,
+                "pid": self._pid, "tid": threading.get_ident(),
+            })
+
+    def counter(self, name, values):
+        if len(self.events) < self.max_events:
+            self.events.append({
+                "name": name, "ph": "C", "ts": self._us(time.perf_counter()),
+                "pid": self._pid, "args": values,
+            })
+
+    def timed(self, fn, name, cat):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, cat, start, time.perf_counter())
+        return wrapper
+
+    # -------- installation --------
+    def wrap(self, obj, names, cat):
+        for name in names:
+            fn = getattr(obj, name, None)
+            if callable(fn):
+                setattr(obj, name, self.timed(fn, f"{type(obj).__name__}.{name}", cat))
+
+    def install(self, app):
+        self.window = app.window
+        self.label_textures = app.label_textures
+        self.tweens = app.tweens
+        self.governor = app.governor
+        self.wrap(app, APP_METHODS, "app")
+        self.wrap(app.store, ("save", "flush"), "io")
+        self.wrap(app.answer_log, ("record", "flush"), "io")
+        self.wrap(app.backgrounds, ("get", "preload"), "io")
+        self.wrap(app.audio, ("play_music", "play_sfx"), "audio")
+        self._patch_clock()
+
+        Clock.schedule_interval(self._on_frame, 0)
+        Clock.schedule_interval(self._update_overlay, 0.5)
+        Logger.info("Profiler: enabled, trace will be written on stop")
+
+    def show_overlay(self):
+        # added after the root widget so it draws on top
+        self.overlay = Label(
+            size_hint=(None, None), font_size="12sp", color=(0.4, 1, 0.4, 1),
+            halign="left", valign="top",
+        )
+        self.window.add_widget(self.overlay)
+
+    def _patch_clock(self):
+        profiler = self
+        schedule_once = Clock.schedule_once
+        schedule_interval = Clock.schedule_interval
+
+        def wrap_callback(callback):
+            module = getattr(callback, "__module__", None)
+            if module not in APP_MODULES:
+                return callback
+            name = getattr(callback, "__qualname__", repr(callback))
+            return profiler.timed(callback, f"clock:{name}", "clock")
+
+        def patched_once(callback, timeout=0):
+            return schedule_once(wrap_callback(callback), timeout)
+
+        def patched_interval(callback, timeout):
+            return schedule_interval(wrap_callback(callback), timeout)
+
+        Clock.schedule_once = patched_once
+        Clock.schedule_interval = patched_interval
+
+    # -------- frames / overlay --------
+    def _on_frame(self, dt):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            frame = now - self._last_frame
+            self.frames += 1
+            self.frame_times.append(frame)
+            if len(self.frame_times) > 240:
+                del self.frame_times[:120]
+            # a slow frame while the governor has lowered the rate is not dropped
+            budget = self.frame_budget
+            if self.governor is not None and self.governor.fps:
+                budget = max(budget, 1.0 / self.governor.fps)
+            if frame > budget * 1.5:
+                self.dropped_frames += 1
+                self.record("dropped frame", "frame", self._last_frame, now)
+        self._last_frame = now
+
+    def _update_overlay(self, dt):
+        recent = sorted(self.frame_times[-120:])
+        if not recent:
+            return
+        avg = sum(recent) / len(recent)
+        p95 = recent[int(len(recent) * 0.95) - 1 if len(recent) > 1 else 0]
+        anims = len(Animation._instances)
+        tweens = len(self.tweens)
+        widgets = count_widgets(self.window)
+        self.counter("frame", {"fps": round(1.0 / avg, 1), "p95_ms": round(p95 * 1000, 2)})
+        self.counter("live", {"animations": anims, "tweens": tweens, "widgets": widgets,
+                              "fps_cap": self.governor.fps})
+        textures = self.label_textures.stats()
+        self.counter("label textures", {"hit_rate": round(textures["hit_rate"], 3),
+                                        "mb": round(textures["bytes"] / 2 ** 20, 2)})
+
+        if self.overlay is not None:
+            self.overlay.text = (
+                f"fps {1.0 / avg:5.1f}  p95 {p95 * 1000:5.1f} ms  dropped {self.dropped_frames}\n"
+                f"animations {anims}  tweens {tweens}  widgets {widgets}\n"
+                f"label textures {textures['hit_rate']:.0%} hits  "
+                f"{textures['bytes'] / 2 ** 20:.1f} MB"
+            )
+            self.overlay.texture_update()
+            self.overlay.size = self.overlay.texture_size
+            self.overlay.pos = (4, self.window.height - self.overlay.height - 4)
+
+    # -------- output --------
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        Logger.info(f"Profiler: {len(self.events)} events, {self.dropped_frames} dropped "
+                    f"of {self.frames} frames, trace written to {path}")
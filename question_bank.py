@@ -0,0 +1,316 @@
+"""Compiled question bank.
+
+`questions.json` is compiled into a compact indexed binary (`questions.qbank`)
+so the app does not have to parse the whole bank before the first frame.
+The loader memory-maps the file and only decodes a chapter's questions the
+first time they are used.
+
+Build step:
+
+    python question_bank.py [questions.json] [questions.qbank]
+
+Layout (little endian):
+
+    header
+    chapter table      one CHAPTER record per chapter
+    question records   one QUESTION record per question, chapter order
+    refs               u32 string ids (options then tags of each question)
+    difficulty index   u32 local question indexes grouped per chapter/difficulty
+    string offsets     u32 * (n_strings + 1)
+    string pool        utf-8 blob, deduplicated
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"BEQB"
+VERSION = 2
+
+DIFFICULTIES = ("easy", "medium", "hard")
+NO_DIFFICULTY = 0xFF
+NO_STRING = 0xFFFFFFFF
+NO_XP = 0xFFFF
+
+# magic, version, flags, n_chapters, n_questions, n_refs, n_diff, n_strings,
+# pool_size, sha256 of the source json
+HEADER = struct.Struct("<4sHHIIIIII32s")
+# title sid, first question, question count, then (start, count) into the
+# difficulty index for each entry of DIFFICULTIES
+CHAPTER = struct.Struct("<III" + "II" * len(DIFFICULTIES))
+# question id, prompt sid, fact sid, refs start, xp, n_options,
+# correct_index, difficulty code, n_tags
+QUESTION = struct.Struct("<QIIIHBBBB")
+U32 = struct.Struct("<I")
+
+
+def question_id(prompt):
+    """Stable 64-bit id for a question, derived from its prompt."""
+    digest = hashlib.blake2b(prompt.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# -------- compile --------
+class _StringPool:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, text):
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = len(self.strings)
+            self.ids[text] = sid
+            self.strings.append(text)
+        return sid
+
+
+def compile_bank(json_path, bank_path):
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw.decode("utf-8"))
+    chapters = data["chapters"]
+
+    pool = _StringPool()
+    chapter_table = []
+    question_table = []
+    refs = []
+    diff_index = []
+
+    for ch in chapters:
+        first = len(question_table)
+        questions = ch["questions"]
+        buckets = {d: [] for d in DIFFICULTIES}
+
+        for local, q in enumerate(questions):
+            difficulty = q.get("difficulty")
+            if difficulty is None:
+                code = NO_DIFFICULTY
+            elif difficulty in DIFFICULTIES:
+                code = DIFFICULTIES.index(difficulty)
+                buckets[difficulty].append(local)
+            else:
+                raise ValueError(f"unknown difficulty {difficulty!r} in {ch['title']!r}")
+
+            options = q["options"]
+            tags = q.get("tags", [])
+            refs_start = len(refs)
+            refs.extend(pool.add(o) for o in options)
+            refs.extend(pool.add(t) for t in tags)
+
+            fact = q.get("fact")
+            xp = q.get("xp")
+            question_table.append(QUESTION.pack(
+                question_id(q["prompt"]),
+                pool.add(q["prompt"]),
+                NO_STRING if fact is None else pool.add(fact),
+                refs_start,
+                NO_XP if xp is None else xp,
+                len(options),
+                q["correct_index"],
+                code,
+                len(tags),
+            ))
+
+        ranges = []
+        for d in DIFFICULTIES:
+            ranges.extend((len(diff_index), len(buckets[d])))
+            diff_index.extend(buckets[d])
+
+        chapter_table.append(CHAPTER.pack(
+            pool.add(ch["title"]), first, len(questions), *ranges
+        ))
+
+    encoded = [s.encode("utf-8") for s in pool.strings]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b"".join(encoded)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, 0,
+        len(chapter_table), len(question_table), len(refs), len(diff_index),
+        len(encoded), len(blob), hashlib.sha256(raw).digest(),
+    )
+
+    tmp_path = bank_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(chapter_table))
+        f.write(b"".join(question_table))
+        f.write(struct.pack(f"<{len(refs)}I", *refs))
+        f.write(struct.pack(f"<{len(diff_index)}I", *diff_index))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(blob)
+    os.replace(tmp_path, bank_path)
+
+
+def is_stale(bank_path, json_path):
+    if not os.path.exists(bank_path):
+        return True
+    with open(bank_path, "rb") as f:
+        head = f.read(6)
+    if head[:4] != MAGIC or struct.unpack("<H", head[4:6].ljust(2, b"\0"))[0] != VERSION:
+        return True
+    if not os.path.exists(json_path):
+        return False
+    return os.path.getmtime(json_path) > os.path.getmtime(bank_path)
+
+
+# -------- load --------
+class LazyChapter(dict):
+    """A chapter dict whose "questions" list is decoded on first access."""
+
+    def __init__(self, title, question_count, loader=None, questions=None):
+        super().__init__(title=title)
+        self.question_count = question_count
+        self._loader = loader
+        if questions is not None:
+            self["questions"] = questions
+
+    @property
+    def loaded(self):
+        return "questions" in self
+
+    def __missing__(self, key):
+        if key != "questions" or self._loader is None:
+            raise KeyError(key)
+        questions = self._loader()
+        self["questions"] = questions
+        return questions
+
+
+def chapters_from_json(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for ch in data["chapters"]:
+        for q in ch["questions"]:
+            q["id"] = question_id(q["prompt"])
+    return [
+        LazyChapter(ch["title"], len(ch["questions"]), questions=ch["questions"])
+        for ch in data["chapters"]
+    ]
+
+
+class QuestionBank:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty file or no mmap support on this platform
+                self._buf = f.read()
+
+        (magic, version, _flags, self.chapter_count, self.total_questions,
+         n_refs, n_diff, n_strings, _pool_size, self.source_hash) = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} question bank")
+
+        self._chapters_at = HEADER.size
+        self._questions_at = self._chapters_at + CHAPTER.size * self.chapter_count
+        self._refs_at = self._questions_at + QUESTION.size * self.total_questions
+        self._diff_at = self._refs_at + 4 * n_refs
+        self._offsets_at = self._diff_at + 4 * n_diff
+        self._pool_at = self._offsets_at + 4 * (n_strings + 1)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def _u32(self, at):
+        return U32.unpack_from(self._buf, at)[0]
+
+    def _string(self, sid):
+        at = self._offsets_at + 4 * sid
+        start, end = struct.unpack_from("<II", self._buf, at)
+        return bytes(self._buf[self._pool_at + start:self._pool_at + end]).decode("utf-8")
+
+    def _chapter_record(self, ci):
+        return CHAPTER.unpack_from(self._buf, self._chapters_at + CHAPTER.size * ci)
+
+    def chapter_title(self, ci):
+        return self._string(self._chapter_record(ci)[0])
+
+    def question_count(self, ci):
+        return self._chapter_record(ci)[2]
+
+    def difficulty_indexes(self, ci, difficulty):
+        """Local question indexes of chapter `ci` with the given difficulty."""
+        rec = self._chapter_record(ci)
+        slot = 3 + 2 * DIFFICULTIES.index(difficulty)
+        start, count = rec[slot], rec[slot + 1]
+        return list(struct.unpack_from(f"<{count}I", self._buf, self._diff_at + 4 * start))
+
+    def load_question(self, ci, qi):
+        first = self._chapter_record(ci)[1]
+        return self._question(first + qi)
+
+    def load_chapter(self, ci):
+        _title, first, count = self._chapter_record(ci)[:3]
+        return [self._question(first + i) for i in range(count)]
+
+    def _question(self, n):
+        (qid, prompt, fact, refs_start, xp, n_options, correct_index,
+         difficulty, n_tags) = QUESTION.unpack_from(self._buf, self._questions_at + QUESTION.size * n)
+        ids = struct.unpack_from(f"<{n_options + n_tags}I", self._buf, self._refs_at + 4 * refs_start)
+
+        q = {
+            "id": qid,
+            "prompt": self._string(prompt),
+            "options": [self._string(s) for s in ids[:n_options]],
+            "correct_index": correct_index,
+        }
+        if fact != NO_STRING:
+            q["fact"] = self._string(fact)
+        if difficulty != NO_DIFFICULTY:
+            q["difficulty"] = DIFFICULTIES[difficulty]
+        if xp != NO_XP:
+            q["xp"] = xp
+        q["tags"] = [self._string(s) for s in ids[n_options:]]
+        return q
+
+    def metadata(self):
+        """(ci, qi, id, difficulty code, xp, tags) for every question.
+
+        Reads only the fixed-size records and tag strings; prompts and
+        options stay encoded.
+        """
+        tag_cache = {}
+        for ci in range(self.chapter_count):
+            _title, first, count = self._chapter_record(ci)[:3]
+            for qi in range(count):
+                (qid, _prompt, _fact, refs_start, xp, n_options, _correct,
+                 difficulty, n_tags) = QUESTION.unpack_from(
+                    self._buf, self._questions_at + QUESTION.size * (first + qi))
+                tags = []
+                at = self._refs_at + 4 * (refs_start + n_options)
+                for sid in struct.unpack_from(f"<{n_tags}I", self._buf, at):
+                    tag = tag_cache.get(sid)
+                    if tag is None:
+                        tag = tag_cache[sid] = self._string(sid)
+                    tags.append(tag)
+                yield ci, qi, qid, difficulty, 10 if xp == NO_XP else xp, tags
+
+    def chapters(self):
+        return [
+            LazyChapter(
+                self.chapter_title(ci),
+                self.question_count(ci),
+                loader=lambda ci=ci: self.load_chapter(ci),
+            )
+            for ci in range(self.chapter_count)
+        ]
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "questions.json")
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".qbank"
+    compile_bank(src, dst)
+    bank = QuestionBank(dst)
+    print(f"{dst}: {bank.chapter_count} chapters, {bank.total_questions} questions, "
+          f"{os.path.getsize(dst)} bytes (source {os.path.getsize(src)} bytes)")
+    bank.close()
@@ -0,0 +1,183 @@
+"""In-memory index over the question bank.
+
+Built once at load time from question metadata only (ids, difficulty, xp,
+tags), so with the compiled bank no prompt or option text is decoded.
+Every question gets a global position; per-chapter, per-difficulty and
+per-tag posting lists hold those positions, and the sampling helpers draw
+k of them without copying or shuffling the underlying lists.
+"""
+from array import array
+from bisect import insort
+
+from question_bank import DIFFICULTIES, NO_DIFFICULTY
+
+
+def sample_positions(n, k, rng):
+    """k distinct indexes out of range(n) in O(k) (Floyd's algorithm)."""
+    k = min(k, n)
+    chosen = []
+    seen = set()
+    for j in range(n - k, n):
+        t = rng.randrange(j + 1)
+        if t in seen:
+            t = j
+        seen.add(t)
+        chosen.append(t)
+    # Floyd's picks are not in random order
+    rng.shuffle(chosen)
+    return chosen
+
+
+class QuestionIndex:
+    def __init__(self):
+        self.ids = array("Q")
+        self.chapter = array("H")
+        self.local = array("I")
+        self.difficulty = array("B")
+        self.xp = array("H")
+        self.by_id = {}
+        self.chapter_start = []      # global position of each chapter's first question
+        self.chapter_len = {}        # reserved chapters that turned out shorter
+        self.reserved = set()        # chapters added with reserve()
+        self.by_difficulty = {d: array("I") for d in DIFFICULTIES}
+        self.by_chapter_difficulty = {}
+        self.by_tag = {}
+
+    # -------- building --------
+    def begin_chapter(self, ci):
+        while len(self.chapter_start) <= ci:
+            self.chapter_start.append(len(self.ids))
+
+    def add(self, ci, qi, qid, difficulty_code, xp, tags):
+        self.begin_chapter(ci)
+        pos = len(self.ids)
+        self.ids.append(qid)
+        self.chapter.append(ci)
+        self.local.append(qi)
+        self.difficulty.append(difficulty_code)
+        self.xp.append(xp)
+        self.by_id[qid] = pos
+        if difficulty_code != NO_DIFFICULTY:
+            d = DIFFICULTIES[difficulty_code]
+            self.by_difficulty[d].append(pos)
+            self.by_chapter_difficulty.setdefault((ci, d), array("I")).append(pos)
+        for tag in tags:
+            self.by_tag.setdefault(tag, array("I")).append(pos)
+        return pos
+
+    def reserve(self, ci, count):
+        """Placeholder entries for a chapter whose metadata is not read yet
+        (a content pack without precomputed "meta"); see fill_chapter."""
+        self.begin_chapter(ci)
+        self.reserved.add(ci)
+        for qi in range(count):
+            self.ids.append(0)
+            self.chapter.append(ci)
+            self.local.append(qi)
+            self.difficulty.append(NO_DIFFICULTY)
+            self.xp.append(10)
+
+    def fill_chapter(self, ci, questions):
+        """Replace a reserved chapter's placeholders with real metadata.
+
+        Placeholders left over when the chapter has fewer questions than
+        reserved are cut off the chapter's range; they are in no posting
+        list, so nothing can pick them.
+        """
+        start = self.chapter_start[ci]
+        reserved = len(self.chapter_range(ci))
+        if len(questions) < reserved:
+            self.chapter_len[ci] = len(questions)
+        for qi, q in enumerate(questions[:reserved]):
+            pos = start + qi
+            self.ids[pos] = q["id"]
+            self.by_id[q["id"]] = pos
+            self.xp[pos] = q.get("xp", 10)
+            d = q.get("difficulty")
+            if d in DIFFICULTIES:
+                self.difficulty[pos] = DIFFICULTIES.index(d)
+                insort(self.by_difficulty[d], pos)
+                self.by_chapter_difficulty.setdefault((ci, d), array("I")).append(pos)
+            for tag in q.get("tags", ()):
+                insort(self.by_tag.setdefault(tag, array("I")), pos)
+
+    @classmethod
+    def from_bank(cls, bank):
+        index = cls()
+        for ci, qi, qid, difficulty_code, xp, tags in bank.metadata():
+            index.add(ci, qi, qid, difficulty_code, xp, tags)
+        return index
+
+    @classmethod
+    def from_chapters(cls, chapters):
+        # decodes every chapter; meant for the plain JSON fallback
+        index = cls()
+        for ci, ch in enumerate(chapters):
+            for qi, q in enumerate(ch["questions"]):
+                d = q.get("difficulty")
+                index.add(ci, qi, q["id"],
+                          DIFFICULTIES.index(d) if d in DIFFICULTIES else NO_DIFFICULTY,
+                          q.get("xp", 10), q.get("tags", ()))
+        return index
+
+    # -------- lookups --------
+    def __len__(self):
+        return len(self.ids)
+
+    def ref(self, pos):
+        """(chapter index, question index within chapter) of a position."""
+        return self.chapter[pos], self.local[pos]
+
+    def position(self, ci, qi):
+        return self.chapter_start[ci] + qi
+
+    def chapter_range(self, ci):
+        start = self.chapter_start[ci]
+        if ci in self.chapter_len:
+            return range(start, start + self.chapter_len[ci])
+        end = self.chapter_start[ci + 1] if ci + 1 < len(self.chapter_start) else len(self.ids)
+        return range(start, end)
+
+    def known_positions(self):
+        """Positions whose metadata was known when the index was built:
+        everything but reserved chapters, even once they are filled, since
+        whether they are depends on what has been played."""
+        if not self.reserved:
+            return range(len(self.ids))
+        return array("I", (pos for pos in range(len(self.ids)) if self.chapter[pos] not in self.reserved))
+
+    def difficulty_of(self, pos):
+        code = self.difficulty[pos]
+        return None if code == NO_DIFFICULTY else DIFFICULTIES[code]
+
+    def postings(self, chapter=None, difficulty=None, tag=None):
+        """Positions matching all given filters, sorted ascending.
+
+        Single filters and chapter + difficulty come straight from the
+        index; a tag combined with anything else is filtered on top.
+        """
+        if chapter is not None and difficulty is not None:
+            base = self.by_chapter_difficulty.get((chapter, difficulty), ())
+        elif difficulty is not None:
+            base = self.by_difficulty.get(difficulty, ())
+        elif chapter is not None:
+            base = self.chapter_range(chapter) if chapter < len(self.chapter_start) else range(0)
+        elif tag is not None:
+            base = self.by_tag.get(tag, ())
+            tag = None
+        else:
+            return range(len(self.ids))
+
+        if tag is None:
+            return base
+        tagged = set(self.by_tag.get(tag, ()))
+        return [pos for pos in base if pos in tagged]
+
+    # -------- sampling --------
+    def sample(self, k, rng, chapter=None, difficulty=None, tag=None):
+        """Up to k distinct positions matching the filters, in random order."""
+        pool = self.postings(chapter, difficulty, tag)
+        return [pool[i] for i in sample_positions(len(pool), k, rng)]
+
+    def sample_refs(self, k, rng, **filters):
+        return [self.ref(pos) for pos in self.sample(k, rng, **filters)]
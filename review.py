@@ -0,0 +1,146 @@
+"""Spaced-repetition review of missed questions.
+
+A missed question becomes a card that is due again after a short delay.
+Each later review follows SM-2: a correct answer grows the interval (1 day,
+6 days, then interval * ease), and a miss drops it back to the start with
+a lower ease. Due times live in a min-heap keyed by due time, so the next
+due cards come off in O(log n) each.
+
+Cards are stored in review.json. The app reads the file on a worker thread
+once it has started (preload()); answers graded before it is in are queued,
+and only the review mode itself waits for it.
+"""
+import heapq
+import threading
+import time
+
+DAY = 24 * 60 * 60
+RELEARN_DELAY = 10 * 60
+START_EASE = 2.5
+MIN_EASE = 1.3
+
+
+def default_deck():
+    # cards: question id (str) -> [due unix time, interval days, ease, reps]
+    return {"version": 1, "cards": {}}
+
+
+class ReviewScheduler:
+    def __init__(self, store):
+        # store: a storage.JsonStore built with default_deck
+        self.store = store
+        self.cards = None
+        self._heap = None
+        self.dirty = False
+        self._loader = None
+        self._loaded = None
+        self._backlog = []            # (qid, correct, now) graded while loading
+
+    def preload(self):
+        """Read the cards on a worker thread instead of on first use."""
+        if self.cards is None and self._loader is None:
+            self._loader = threading.Thread(target=self._read, name="review-load", daemon=True)
+            self._loader.start()
+
+    def _read(self):
+        cards = self.store.load()["cards"]
+        heap = [(card[0], int(key)) for key, card in cards.items()]
+        heapq.heapify(heap)
+        self._loaded = (cards, heap)
+
+    def _load(self):
+        if self.cards is None:
+            if self._loader is not None:
+                self._loader.join()
+            else:
+                self._read()
+            self.cards, self._heap = self._loaded
+            self._loaded = None
+            backlog, self._backlog = self._backlog, []
+            for qid, correct, now in backlog:
+                self.record(qid, correct, now)
+
+    def __len__(self):
+        self._load()
+        return len(self.cards)
+
+    # -------- grading --------
+    def record(self, qid, correct, now=None):
+        """Grade an answer; only misses create new cards."""
+        now = time.time() if now is None else now
+        if self.cards is None and self._loader is not None and self._loader.is_alive():
+            # don't wait on the UI thread; graded once the cards are in
+            self._backlog.append((qid, correct, now))
+            return
+        self._load()
+        key = str(qid)
+        card = self.cards.get(key)
+        if card is None:
+            if correct:
+                return
+            card = self.cards[key] = [0, 0, START_EASE, 0]
+
+        _due, interval, ease, reps = card
+        if correct:
+            reps += 1
+            if reps == 1:
+                interval = 1
+            elif reps == 2:
+                interval = 6
+            else:
+                interval = round(interval * ease)
+            # SM-2 ease update for quality 4
+            ease = max(MIN_EASE, ease + 0.1 - (5 - 4) * (0.08 + (5 - 4) * 0.02))
+            due = now + interval * DAY
+        else:
+            reps = 0
+            interval = 0
+            ease = max(MIN_EASE, ease - 0.2)
+            due = now + RELEARN_DELAY
+
+        card[:] = [due, interval, ease, reps]
+        # the old heap entry goes stale and is skipped when popped
+        heapq.heappush(self._heap, (due, qid))
+        self.dirty = True
+
+    # -------- due cards --------
+    def due(self, k, now=None):
+        """Up to k question ids due by `now`, most overdue first."""
+        self._load()
+        now = time.time() if now is None else now
+        heap = self._heap
+        picked = []
+        while heap and len(picked) < k and heap[0][0] <= now:
+            due, qid = heapq.heappop(heap)
+            card = self.cards.get(str(qid))
+            if card is None or card[0] != due or qid in picked:
+                continue
+            picked.append(qid)
+        # keep them queued until they are actually answered
+        for qid in picked:
+            heapq.heappush(heap, (self.cards[str(qid)][0], qid))
+        return picked
+
+    def next_due_at(self):
+        self._load()
+        while self._heap:
+            due, qid = self._heap[0]
+            card = self.cards.get(str(qid))
+            if card is not None and card[0] == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def forget(self, qid):
+        # e.g. the question left the bank
+        self._load()
+        if self.cards.pop(str(qid), None) is not None:
+            self.dirty = True
+
+    # -------- persistence --------
+    def save(self):
+        if self._backlog:
+            self._load()
+        if self.dirty:
+            self.dirty = False
+            self.store.save()
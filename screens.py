@@ -0,0 +1,57 @@
+"""Screens built on demand.
+
+Each screen is registered with its class and its own kv file. Nothing is
+built until the screen is first asked for (`get_screen`, or setting
+`current`, which goes through `get_screen`), so startup only pays for the
+welcome screen. After the first frames the remaining screens can be built
+in the background, one per frame, so navigating later does not stall
+either.
+"""
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.logger import Logger
+from kivy.uix.screenmanager import ScreenManager
+
+
+class LazyScreenManager(ScreenManager):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pending = {}      # name -> (screen class, kv file)
+        self._idle_order = []
+
+    def register(self, name, cls, kv_file):
+        self._pending[name] = (cls, kv_file)
+
+    def is_built(self, name):
+        return name not in self._pending
+
+    def build_screen(self, name):
+        cls, kv_file = self._pending.pop(name)
+        if kv_file:
+            Builder.load_file(kv_file)
+        self.add_widget(cls(name=name))
+
+    def get_screen(self, name):
+        if name in self._pending:
+            self.build_screen(name)
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._pending or super().has_screen(name)
+
+    # -------- background building --------
+    def build_idle(self, order=None, delay=0):
+        """Build the screens still pending one per frame, in `order` first."""
+        self._idle_order = [n for n in (order or []) if n in self._pending]
+        self._idle_order += [n for n in self._pending if n not in self._idle_order]
+        Clock.schedule_once(self._build_next, delay)
+
+    def _build_next(self, _dt):
+        while self._idle_order:
+            name = self._idle_order.pop(0)
+            if name in self._pending:
+                self.build_screen(name)
+                Logger.debug(f"Screens: built {name} in the background")
+                break
+        if self._idle_order:
+            Clock.schedule_once(self._build_next, 0)
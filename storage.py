@@ -0,0 +1,202 @@
+"""Crash-safe persistence for scores.json.
+
+Writes go to a temp file that is fsynced and then renamed over the real
+file, so a crash mid-write can never truncate the player's progress. save()
+only takes a snapshot; a background thread writes the latest snapshot after
+a short delay, so bursts of saves (unlock_skin then set_active_skin) turn
+into a single disk write and no button tap waits on I/O.
+"""
+import json
+import os
+import threading
+import time
+
+from kivy.logger import Logger
+
+SCHEMA_VERSION = 4
+
+DEFAULT_SCORES = {
+    "schema_version": SCHEMA_VERSION,
+    "best_score": 0,
+    "best_accuracy": 0.0,
+    "total_coins_earned": 0,      # lifetime earned
+    "coin_balance": 0,            # spendable coins for skins
+    "highest_chapter_completed": 1,
+    "total_correct_all_time": 0,
+    "total_questions_all_time": 0,
+    "max_coins_single_run": 0,
+    "daily_streak": 0,
+    "last_daily_date": "",
+    "skins_unlocked": ["default"],
+    "active_skin": "default",
+    "achievements_unlocked": [],
+    "rapid_mode": False,
+}
+
+
+def _migrate_1_to_2(data):
+    # v1 files had no schema_version and may predate any of the fields
+    for key in ("best_score", "total_coins_earned", "coin_balance",
+                "total_correct_all_time", "total_questions_all_time",
+                "max_coins_single_run", "daily_streak"):
+        data.setdefault(key, 0)
+    data.setdefault("best_accuracy", 0.0)
+    data.setdefault("highest_chapter_completed", 1)
+    data.setdefault("last_daily_date", "")
+    data.setdefault("skins_unlocked", ["default"])
+    data.setdefault("active_skin", "default")
+    return data
+
+
+def _migrate_2_to_3(data):
+    data.setdefault("achievements_unlocked", [])
+    return data
+
+
+def _migrate_3_to_4(data):
+    data.setdefault("rapid_mode", False)
+    return data
+
+
+# from_version -> function returning the data at from_version + 1
+MIGRATIONS = {
+    1: _migrate_1_to_2,
+    2: _migrate_2_to_3,
+    3: _migrate_3_to_4,
+}
+
+
+def migrate(data):
+    version = data.get("schema_version", 1)
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+        data["schema_version"] = version
+    return data
+
+
+def write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # make the rename itself durable where the platform allows it
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class ScoreStore:
+    def __init__(self, path, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.data = None
+        self._pending = None          # (seq, json text)
+        self._seq = 0
+        self._written = 0
+        self._due = 0.0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._worker = None
+
+    def load(self):
+        self.data = json.loads(json.dumps(DEFAULT_SCORES))
+        if not os.path.exists(self.path):
+            return self.data
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            Logger.error(f"Storage: could not read {self.path}, starting fresh: {e}")
+            return self.data
+        if not isinstance(data, dict) or data.get("schema_version", 1) > SCHEMA_VERSION:
+            Logger.error(f"Storage: unsupported {self.path}, starting fresh")
+            return self.data
+        self.data = migrate(data)
+        return self.data
+
+    def save(self):
+        """Snapshot the current data and write it shortly, off the UI thread."""
+        snapshot = json.dumps(self.data, indent=4)
+        with self._cond:
+            self._seq += 1
+            self._pending = (self._seq, snapshot)
+            self._due = time.monotonic() + self.delay
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="score-store", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Write any pending snapshot now (app stop / pause). Also waits
+        for a write the worker has already started."""
+        with self._write_lock:
+            with self._cond:
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write(*pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # keep pushing the deadline back while saves keep coming
+                while True:
+                    remaining = self._due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            # taken and written under the write lock, so a flush() can't
+            # return between the two
+            with self._write_lock:
+                with self._cond:
+                    pending, self._pending = self._pending, None
+                if pending is not None:
+                    self._write(*pending)
+
+    def _write(self, seq, snapshot):
+        # called with _write_lock held
+        try:
+            # a flush() may already have written something newer
+            if seq <= self._written:
+                return
+            write_atomic(self.path, snapshot)
+            self._written = seq
+        except OSError as e:
+            Logger.error(f"Storage: could not write {self.path}: {e}")
+
+
+class JsonStore(ScoreStore):
+    """Same debounced atomic writes for other small versioned JSON documents.
+
+    `defaults` returns a fresh document; a file whose "version" differs
+    from the default's is ignored.
+    """
+
+    def __init__(self, path, defaults, delay=0.5):
+        super().__init__(path, delay)
+        self.defaults = defaults
+
+    def load(self):
+        self.data = self.defaults()
+        if not os.path.exists(self.path):
+            return self.data
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            Logger.error(f"Storage: could not read {self.path}, starting fresh: {e}")
+            return self.data
+        if isinstance(data, dict) and data.get("version") == self.data["version"]:
+            self.data.update(data)
+        return self.data
@@ -0,0 +1,71 @@
+"""Diffing chapter theme controller.
+
+show_question applies the chapter theme for every question. The controller
+remembers which (chapter, skin) is on screen and skips the whole theme when
+it has not changed, caches the skin-tinted palette per (chapter, skin), and
+only assigns properties whose value actually differs, so kv canvas rules are
+not re-run for nothing.
+"""
+
+# GameScreen's own defaults, used when a chapter theme leaves a color out
+DEFAULT_PALETTE = {
+    "banner_color": [0.15, 0.02, 0.25, 1],
+    "accent_color": [0.12, 0.04, 0.25, 1],
+    "button_color": [0.2, 0.9, 0.9, 1],
+}
+
+
+def add_color(c, t):
+    return [max(0, min(1, c[i] + t[i])) for i in range(4)]
+
+
+class ThemeController:
+    def __init__(self):
+        self._palettes = {}
+        self.applied = None
+        self.dispatches = 0
+        self.question_dispatches = 0
+        self.last_question_dispatches = 0
+
+    def palette(self, chapter_index, theme, skin_name, skin):
+        key = (chapter_index, skin_name)
+        palette = self._palettes.get(key)
+        if palette is None:
+            # apply skin tint on top (Option 1: keep chapter identity)
+            banner = add_color(theme.get("banner_color", DEFAULT_PALETTE["banner_color"]), skin["banner_tint"])
+            accent = add_color(theme.get("accent_color", DEFAULT_PALETTE["accent_color"]), skin["accent_tint"])
+            button = add_color(theme.get("button_color", DEFAULT_PALETTE["button_color"]), skin["button_tint"])
+            palette = {
+                "banner_color": banner,
+                "accent_color": accent,
+                "button_color": button,
+                "button_down_color": [min(1, x * 0.85) for x in button],
+            }
+            self._palettes[key] = palette
+        return palette
+
+    def is_applied(self, chapter_index, skin_name):
+        return self.applied == (chapter_index, skin_name)
+
+    def mark_applied(self, chapter_index, skin_name):
+        self.applied = (chapter_index, skin_name)
+
+    def reset(self):
+        self.applied = None
+
+    def push(self, widget, name, value):
+        """Assign widget.name = value only if it differs; returns True if pushed."""
+        if getattr(widget, name) == value:
+            return False
+        setattr(widget, name, value)
+        self.dispatches += 1
+        self.question_dispatches += 1
+        return True
+
+    def push_palette(self, widget, palette):
+        for name, value in palette.items():
+            self.push(widget, name, value)
+
+    def begin_question(self):
+        self.last_question_dispatches = self.question_dispatches
+        self.question_dispatches = 0
@@ -0,0 +1,444 @@
+"""Benchmarks for startup, chapter switch, question render and answer latency.
+
+Runs headless: Kivy is started with the mock GL backend and SDL's offscreen
+video driver, so no display or GPU is needed. The app runs from a temporary
+copy of the tree with its own user data and Kivy home, so scores.json and the
+other files a session writes are left alone. Engine-only benchmarks run even
+where Kivy is not installed; where it is, a failing app benchmark is
+reported and makes the run exit with status 1.
+
+    python tools/benchmark.py                          # print a table
+    python tools/benchmark.py --json out.json          # also write JSON
+    python tools/benchmark.py --save-baseline          # store as baseline
+    python tools/benchmark.py --compare                # report regressions
+
+Every metric is measured --runs times (default 3) and each statistic keeps
+its best run, so one run slowed down by something else on the machine does
+not count. The baseline (tools/benchmark_baseline.json, not tracked) is a
+reference for the machine it was saved on; --compare lists metrics whose p50
+or p95 is more than --tolerance (default 15%) and more than --floor-ms
+(default 0.5 ms) above it, but does not change the exit status.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(BASE_DIR, "tools", "benchmark_baseline.json")
+sys.path.insert(0, BASE_DIR)
+
+HEADLESS_ENV = {
+    "KIVY_NO_ARGS": "1",
+    "KIVY_NO_CONSOLELOG": "1",
+    "KIVY_NO_FILELOG": "1",
+    "KIVY_GL_BACKEND": "mock",
+    "SDL_VIDEODRIVER": "offscreen",
+    "SDL_AUDIODRIVER": "dummy",
+    # keep sys.stderr: Kivy's default mode sends it to the log, failures included
+    "KIVY_LOG_MODE": "MIXED",
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+        "mean": round(sum(samples) / len(samples), 4) if samples else 0.0,
+    }
+
+
+def best_of(runs):
+    """Summary of several runs of one metric, each statistic at its best."""
+    summaries = [summarize(samples) for samples in runs]
+    best = {key: min(s[key] for s in summaries) for key in ("p50", "p95", "p99", "mean")}
+    return dict(best, n=summaries[0]["n"], runs=len(runs))
+
+
+def timed(fn, repeat, setup=None, runs=1):
+    """`runs` lists of `repeat` timings of fn() in ms."""
+    results = []
+    for _ in range(runs):
+        samples = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000.0)
+        results.append(samples)
+    return results
+
+
+def sandbox():
+    """A temporary copy of the app to run it from, with the user data and
+    Kivy home inside it, so a benchmark writes nothing in the real tree."""
+    tree = tempfile.mkdtemp(prefix="benchmark-")
+    shutil.copytree(BASE_DIR, os.path.join(tree, "app"),
+                    ignore=shutil.ignore_patterns(".git", "__pycache__", "*.pyc"))
+    env = {
+        # App.user_data_dir: XDG_CONFIG_HOME on Linux, APPDATA on Windows
+        "XDG_CONFIG_HOME": os.path.join(tree, "config"),
+        "APPDATA": os.path.join(tree, "config"),
+        "KIVY_HOME": os.path.join(tree, "kivy"),
+    }
+    os.makedirs(env["XDG_CONFIG_HOME"])
+    return tree, os.path.join(tree, "app"), env
+
+
+# -------- engine (no Kivy) --------
+def bench_engine(repeat, runs):
+    import question_bank
+    from engine import GameEngine
+    from question_index import QuestionIndex
+
+    json_path = os.path.join(BASE_DIR, "questions.json")
+    bank_path = os.path.join(BASE_DIR, "questions.qbank")
+    if question_bank.is_stale(bank_path, json_path):
+        question_bank.compile_bank(json_path, bank_path)
+
+    results = {
+        "data.load_json": timed(lambda: question_bank.chapters_from_json(json_path), repeat, runs=runs),
+        "data.open_bank": timed(lambda: question_bank.QuestionBank(bank_path).chapters(), repeat, runs=runs),
+        "data.decode_chapter": timed(lambda: question_bank.QuestionBank(bank_path).load_chapter(0), repeat,
+                                     runs=runs),
+        "data.build_index": timed(lambda: QuestionIndex.from_bank(question_bank.QuestionBank(bank_path)), repeat,
+                                  runs=runs),
+    }
+
+    chapters = question_bank.chapters_from_json(json_path)
+    engine = GameEngine(chapters, scores={}, rng=random.Random(1))
+    results["engine.start_adventure"] = timed(engine.start_adventure, repeat, runs=runs)
+
+    finished = []
+    engine.bind("chapter_finished", lambda summary: finished.append(summary["last"]))
+
+    def next_round():
+        if finished:
+            if finished.pop():
+                engine.start_adventure()
+            else:
+                engine.continue_to_next_chapter()
+
+    def answer_cycle():
+        engine.answer(0)
+        engine.next_step()
+
+    engine.start_adventure()
+    results["engine.answer_cycle"] = timed(answer_cycle, repeat, setup=next_round, runs=runs)
+    return results
+
+
+# -------- app (Kivy, headless) --------
+def cold_start_child():
+    """Runs in a fresh interpreter, from the sandbox copy of this file:
+    time import + build of the real app."""
+    os.environ.update(HEADLESS_ENV)
+    os.chdir(BASE_DIR)
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    app = main.AdventureApp()
+    app.build()
+    built = time.perf_counter()
+    print(json.dumps({
+        "import": (imported - start) * 1000.0,
+        "build": (built - imported) * 1000.0,
+        "total": (built - start) * 1000.0,
+    }))
+
+
+def bench_cold_start(repeat, runs, app_dir, sandbox_env):
+    names = {"startup.import": "import", "startup.build": "build", "startup.cold_start": "total"}
+    samples = {name: [] for name in names}
+    env = dict(os.environ, **HEADLESS_ENV, **sandbox_env)
+    for _ in range(runs):
+        run = {name: [] for name in names}
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, os.path.join(app_dir, "tools", "benchmark.py"), "--child-cold-start"],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            data = json.loads(out)
+            for name, key in names.items():
+                run[name].append(data[key])
+        for name in names:
+            samples[name].append(run[name])
+    return samples
+
+
+def check_label_textures(app):
+    """The cached texture install() puts on a real game label must match
+    what the label renders itself, refs included for markup."""
+    game = app.sm.get_screen("game")
+    label = game.ids["question_lbl"]
+    markup_was = label.markup
+    for markup in (False, True):
+        label.markup = markup
+        label.text = "Which [ref=x]one[/ref] of these?" if markup else "Which one of these?"
+        app.label_textures.install(label)
+        cached = (tuple(label.texture.size), dict(label.refs))
+        label.texture_update()
+        rendered = (tuple(label.texture.size), dict(label.refs))
+        if cached != rendered:
+            raise RuntimeError(f"LabelTextureCache.install (markup={markup}): {cached} != {rendered}")
+    label.markup = markup_was
+
+
+def check_short_pack():
+    """A pack chapter without "meta" that has fewer questions than its
+    manifest says must play through on the questions it has."""
+    import tempfile
+    import packs
+    from engine import GameEngine
+    from question_index import QuestionIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pack_dir = os.path.join(tmp, "short")
+        os.makedirs(os.path.join(pack_dir, "chapters"))
+        manifest = {"id": "short", "chapters": []}
+        expected = set()
+        for name, claimed, real in (("short", 12, 3), ("next", 2, 2)):
+            questions = [{"prompt": f"{name} question {i}?", "options": ["a", "b", "c", "d"],
+                          "correct_index": 0, "difficulty": "easy"} for i in range(real)]
+            expected.update(q["prompt"] for q in questions)
+            rel = f"chapters/{name}.json"
+            with open(os.path.join(pack_dir, rel), "w", encoding="utf-8") as f:
+                json.dump(questions, f)
+            manifest["chapters"].append({"title": name, "file": rel, "questions": claimed})
+        with open(os.path.join(pack_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        index = QuestionIndex()
+        chapters = packs.ContentPack(pack_dir, os.path.join(tmp, "cache")).chapters(index)
+        engine = GameEngine(chapters, scores={}, rng=random.Random(1), index=index)
+        seen = []
+        finished = []
+        engine.bind("question", lambda question, **_: seen.append(question["prompt"]))
+        engine.bind("chapter_finished", lambda summary: finished.append(summary["last"]))
+        engine.start_adventure()
+        for _ in range(len(expected) + len(manifest["chapters"])):
+            if finished:
+                if finished.pop():
+                    break
+                engine.continue_to_next_chapter()
+                continue
+            engine.answer(0)
+            engine.next_step()
+        if sorted(seen) != sorted(expected):
+            raise RuntimeError(f"short pack played {sorted(seen)}, expected {sorted(expected)}")
+
+
+def bench_app(repeat, runs, app_dir, sandbox_env):
+    os.environ.update(HEADLESS_ENV, **sandbox_env)
+    os.chdir(app_dir)
+    # main.py from the sandbox, so its base_dir is the copy
+    sys.path.insert(0, app_dir)
+    from kivy.clock import Clock
+    from kivy.lang import Builder
+    import main
+
+    app = main.AdventureApp()
+    app.build()
+    results = {}
+
+    # the startup share: shared widgets plus the welcome screen's rules
+    kv_files = [os.path.join(app_dir, "kv", name) for name in ("common.kv", "welcome.kv")]
+
+    def unload_kv():
+        for kv in kv_files:
+            Builder.unload_file(kv)
+
+    results["startup.kv_load"] = timed(
+        lambda: [Builder.load_file(kv) for kv in kv_files], repeat, setup=unload_kv, runs=runs
+    )
+    # everything else is built lazily; make sure it is there before timing
+    for name, _cls in main.SCREENS:
+        app.sm.get_screen(name)
+
+    screen_classes = (main.WelcomeScreen, main.GameScreen, main.ChapterEndScreen, main.EndScreen,
+                      main.ProfileScreen, main.SkinsScreen, main.DailyResultScreen)
+    results["startup.screens"] = timed(lambda: [cls() for cls in screen_classes], repeat, runs=runs)
+
+    check_label_textures(app)
+    check_short_pack()
+    engine = app.engine
+    app.start_game()
+
+    def chapter_switch():
+        if engine.chapter_index >= len(app.chapters) - 1:
+            app.reset_state()
+            engine.start_adventure()
+        engine.question_index = engine.chapter_sizes[engine.chapter_index]
+        app.continue_to_next_chapter()
+
+    results["game.chapter_switch"] = timed(chapter_switch, repeat, setup=Clock.tick, runs=runs)
+    results["game.question_render"] = timed(app.show_question, repeat, setup=Clock.tick, runs=runs)
+
+    def next_round():
+        Clock.tick()
+        if app.sm.current == "chapter_end":
+            app.continue_to_next_chapter()
+        elif app.sm.current != "game":
+            app.reset_state()
+            app.sm.current = "game"
+            engine.start_adventure()
+
+    def answer_cycle():
+        # the tap (scoring, feedback, saving), then the step to the next
+        # question without waiting out the feedback window
+        app.on_answer(0, app.sm.get_screen("game").ids["opt1"])
+        app._next_step()
+
+    results["game.answer_cycle"] = timed(answer_cycle, repeat, setup=next_round, runs=runs)
+
+    # question to question: show the next one and render its labels, cold
+    # and with the look-ahead done during the (skipped) feedback pause
+    def before_transition(prefetch):
+        next_round()
+        while engine.question_index >= engine.chapter_sizes[engine.chapter_index] - 1:
+            # the next step would end the chapter
+            app._next_step()
+            next_round()
+        if prefetch:
+            app.prefetch_next()
+
+    def transition():
+        app._next_step()
+        Clock.tick_draw()   # runs the label renders queued for the next frame
+
+    results["game.transition"] = timed(transition, repeat, setup=lambda: before_transition(False), runs=runs)
+    results["game.transition_prefetched"] = timed(
+        transition, repeat, setup=lambda: before_transition(True), runs=runs
+    )
+    app.on_stop()
+    return results
+
+
+def run_app_benchmarks(args, samples):
+    """Add the startup and app metrics to `samples`; False if any failed."""
+    ok = True
+    tree, app_dir, sandbox_env = sandbox()
+    try:
+        try:
+            samples.update(bench_cold_start(args.cold_repeat, args.runs, app_dir, sandbox_env))
+        except subprocess.CalledProcessError as e:
+            ok = False
+            print(f"FAILED startup benchmark: exit status {e.returncode}\n{e.stderr}", file=sys.stderr)
+        try:
+            samples.update(bench_app(args.repeat, args.runs, app_dir, sandbox_env))
+        except Exception:
+            ok = False
+            print("FAILED app benchmarks:", file=sys.stderr)
+            traceback.print_exc()
+    finally:
+        os.chdir(BASE_DIR)
+        shutil.rmtree(tree, ignore_errors=True)
+    return ok
+
+
+# -------- report --------
+def compare(current, baseline, tolerance, floor_ms):
+    regressions = []
+    for name, stats in current["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50", "p95"):
+            # sub-millisecond metrics swing by more than any percentage
+            if base[key] > 0 and stats[key] > max(base[key] * (1.0 + tolerance), base[key] + floor_ms):
+                regressions.append(
+                    f"{name} {key}: {stats[key]:.3f} ms vs baseline {base[key]:.3f} ms "
+                    f"(+{(stats[key] / base[key] - 1.0) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--cold-repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3, help="keep the best of this many runs")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--floor-ms", type=float, default=0.5,
+                        help="ignore regressions smaller than this in absolute terms")
+    parser.add_argument("--engine-only", action="store_true")
+    parser.add_argument("--child-cold-start", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_cold_start:
+        cold_start_child()
+        return 0
+
+    samples = bench_engine(args.repeat, args.runs)
+    failed = False
+    if not args.engine_only:
+        if importlib.util.find_spec("kivy") is None:
+            print("skipping app benchmarks: Kivy is not installed", file=sys.stderr)
+        else:
+            failed = not run_app_benchmarks(args, samples)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "metrics": {name: best_of(runs) for name, runs in sorted(samples.items())},
+    }
+
+    print(f"{'metric':28} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, stats in report["metrics"].items():
+        print(f"{name:28} {stats['n']:5} {stats['p50']:10.3f} {stats['p95']:10.3f} {stats['p99']:10.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if failed:
+        print("app benchmarks failed; results are incomplete", file=sys.stderr)
+        return 1
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+
+    if args.compare:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except OSError:
+            print(f"no baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 0
+        # the baseline only means something on the machine it was saved on,
+        # so regressions are reported, not failed on
+        regressions = compare(report, baseline, args.tolerance, args.floor_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("no regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Offline asset build: device-sized background variants.
+
+Generates downscaled copies of the chapter backgrounds for a set of
+resolution buckets and writes images/variants/manifest.json, which
+assets.VariantResolver uses at runtime to pick the smallest image that still
+covers the window. The backgrounds are the bg_image entries of themes.json.
+
+    pip install pillow
+    python tools/build_assets.py [--webp] [--quality 82]
+
+Originals are never modified and never upscaled. An original larger than the
+top bucket need not be packaged: its top-bucket variant is the fallback.
+The tracked buildozer.spec is never rewritten; once the variants exist, the
+originals are left out at build time through buildozer's environment
+override of the spec's (empty) source.exclude_patterns:
+
+    APP_SOURCE_EXCLUDE_PATTERNS=$(python tools/build_assets.py --print-excludes) \
+        buildozer android release
+"""
+import argparse
+import json
+import os
+
+from PIL import Image
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(BASE_DIR, "images")
+VARIANTS_DIR = os.path.join(IMAGES_DIR, "variants")
+MANIFEST = os.path.join(VARIANTS_DIR, "manifest.json")
+THEMES = os.path.join(BASE_DIR, "themes.json")
+
+# long-edge buckets: low-end phones, 720p, 1080p, 1440p
+BUCKETS = (640, 960, 1280, 1920)
+
+
+def theme_backgrounds():
+    with open(THEMES, "r", encoding="utf-8") as f:
+        themes = json.load(f)["themes"]
+    paths = []
+    for theme in themes:
+        path = theme.get("bg_image")
+        if not path or path in paths:
+            continue
+        if os.path.exists(os.path.join(BASE_DIR, path)):
+            paths.append(path)
+        else:
+            print(f"{path}: missing, skipped")
+    return paths
+
+
+def rel(path):
+    return os.path.relpath(path, BASE_DIR).replace(os.sep, "/")
+
+
+def build_variants(path, quality, webp):
+    src_path = os.path.join(BASE_DIR, path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    variants = []
+
+    with Image.open(src_path) as src:
+        src = src.convert("RGB")
+        src_w, src_h = src.size
+        long_edge = max(src_w, src_h)
+
+        for bucket in BUCKETS:
+            if bucket >= long_edge:
+                break
+            scale = bucket / long_edge
+            size = (max(1, round(src_w * scale)), max(1, round(src_h * scale)))
+            img = src.resize(size, Image.LANCZOS)
+
+            out = os.path.join(VARIANTS_DIR, f"{stem}_{size[0]}x{size[1]}.jpg")
+            img.save(out, "JPEG", quality=quality, optimize=True, progressive=False)
+            variants.append({"path": rel(out), "width": size[0], "height": size[1],
+                             "format": "jpg", "bytes": os.path.getsize(out)})
+
+            if webp:
+                out = os.path.join(VARIANTS_DIR, f"{stem}_{size[0]}x{size[1]}.webp")
+                img.save(out, "WEBP", quality=quality, method=6)
+                variants.append({"path": rel(out), "width": size[0], "height": size[1],
+                                 "format": "webp", "bytes": os.path.getsize(out)})
+
+    return {
+        "width": src_w,
+        "height": src_h,
+        "bytes": os.path.getsize(src_path),
+        # the top-bucket variant stands in for anything larger
+        "packaged": long_edge <= BUCKETS[-1],
+        "variants": variants,
+    }
+
+
+def excluded_originals():
+    """Originals the last build found no need to package, as a
+    source.exclude_patterns value; empty without a build."""
+    try:
+        with open(MANIFEST, "r", encoding="utf-8") as f:
+            images = json.load(f)["images"]
+    except (OSError, ValueError, KeyError):
+        return ""
+    return ",".join(path for path, entry in images.items() if not entry["packaged"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quality", type=int, default=82)
+    parser.add_argument("--webp", action="store_true", help="also write WebP variants")
+    parser.add_argument("--print-excludes", action="store_true",
+                        help="only print the originals to leave out of the package")
+    args = parser.parse_args()
+
+    if args.print_excludes:
+        print(excluded_originals())
+        return
+
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    manifest = {"version": 1, "buckets": list(BUCKETS), "images": {}}
+    for path in theme_backgrounds():
+        entry = build_variants(path, args.quality, args.webp)
+        manifest["images"][path] = entry
+        smallest = min((v["bytes"] for v in entry["variants"]), default=entry["bytes"])
+        print(f"{path}: {entry['width']}x{entry['height']} {entry['bytes']} bytes, "
+              f"{len(entry['variants'])} variants, smallest {smallest} bytes"
+              f"{'' if entry['packaged'] else ', original not packaged'}")
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"wrote {rel(MANIFEST)}")
+    print(f"originals to leave out of the package: {excluded_originals() or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
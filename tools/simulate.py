@@ -0,0 +1,125 @@
+"""Headless game simulation.
+
+Plays complete adventure or daily sessions through engine.GameEngine with a
+simple player model (probability of answering correctly per difficulty),
+spread over a process pool, and reports reward / score distributions.
+
+    python tools/simulate.py --sessions 200000 --mode adventure --skill 0.9,0.7,0.5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import question_bank  # noqa: E402
+from engine import GameEngine  # noqa: E402
+
+_chapters = None
+
+
+def _load_chapters():
+    global _chapters
+    if _chapters is None:
+        _chapters = question_bank.chapters_from_json(os.path.join(BASE_DIR, "questions.json"))
+    return _chapters
+
+
+def play_session(engine, mode, skill, rng):
+    """Play one session to the end; returns (score, coins, xp, answered)."""
+    state = {"done": False, "answered": 0}
+
+    def on_question(question, **_):
+        p = skill.get(question.get("difficulty"), skill["medium"])
+        correct_visual = engine.option_map.index(question["correct_index"])
+        if rng.random() < p:
+            pick = correct_visual
+        else:
+            pick = rng.choice([i for i in range(len(engine.option_map)) if i != correct_visual])
+        state["pick"] = pick
+
+    def on_done(**_):
+        state["done"] = True
+
+    def on_chapter(summary):
+        if not summary["last"]:
+            state["continue"] = True
+
+    engine.unbind_all()
+    engine.bind("question", on_question)
+    engine.bind("chapter_finished", on_chapter)
+    engine.bind("game_finished", on_done)
+    engine.bind("daily_finished", on_done)
+
+    if mode == "daily":
+        engine.start_daily()
+    else:
+        engine.start_adventure()
+
+    while not state["done"]:
+        if state.pop("continue", False):
+            engine.continue_to_next_chapter()
+            continue
+        engine.answer(state["pick"])
+        state["answered"] += 1
+        engine.next_step()
+
+    return engine.score, engine.coins, engine.xp, state["answered"]
+
+
+def run_batch(args):
+    sessions, mode, skill, seed = args
+    rng = random.Random(seed)
+    engine = GameEngine(_load_chapters(), scores={}, rng=random.Random(seed + 1))
+    return [play_session(engine, mode, skill, rng) for _ in range(sessions)]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--mode", choices=("adventure", "daily"), default="adventure")
+    parser.add_argument("--skill", default="0.85,0.65,0.45",
+                        help="chance of a correct answer for easy,medium,hard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    easy, medium, hard = (float(x) for x in args.skill.split(","))
+    skill = {"easy": easy, "medium": medium, "hard": hard}
+
+    batches = max(1, args.workers * 4)
+    per_batch, extra = divmod(args.sessions, batches)
+    jobs = [(per_batch + (1 if i < extra else 0), args.mode, skill, args.seed + 7919 * i)
+            for i in range(batches)]
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for batch in pool.map(run_batch, [j for j in jobs if j[0]]):
+            results.extend(batch)
+    elapsed = time.perf_counter() - start
+
+    scores = [r[0] for r in results]
+    coins = [r[1] for r in results]
+    xp = [r[2] for r in results]
+    answered = sum(r[3] for r in results)
+
+    print(f"{len(results)} {args.mode} sessions in {elapsed:.2f}s "
+          f"({len(results) / elapsed * 60:,.0f} sessions/min, {answered / elapsed:,.0f} answers/s)")
+    for name, values in (("score", scores), ("coins", coins), ("xp", xp)):
+        print(f"  {name:6} mean {statistics.fmean(values):8.1f}  p50 {percentile(values, 50):6}  "
+              f"p95 {percentile(values, 95):6}  max {max(values):6}")
+
+
+if __name__ == "__main__":
+    main()
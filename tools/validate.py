@@ -0,0 +1,293 @@
+"""Question bank and content pack validator.
+
+Checks questions.json and the packs in packs/ before they ship:
+
+- schema: prompt, four distinct options, correct_index in range, known
+  difficulty, positive xp, string tags / fact
+- exact duplicate prompts, and near duplicates found with MinHash over
+  character 4-grams plus LSH banding
+- answer leaks: the correct option spelled out in the prompt
+- per-chapter balance: enough questions for a run, every difficulty present,
+  no difficulty dominating
+
+Chapters are checked in parallel on a process pool.
+
+    python tools/validate.py                          # questions.json + packs/
+    python tools/validate.py packs/space.zip --near 0.7
+    python tools/validate.py --write-meta             # also emit runtime metadata
+
+With --write-meta the compiled bank (questions.qbank) is rebuilt from
+questions.json, and every pack manifest gets its chapters' question counts
+and per-question "meta" ([id, difficulty, xp, tags]), so the app never has
+to derive them at startup. Exits with 1 when there are errors.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import question_bank  # noqa: E402
+from question_bank import DIFFICULTIES, question_id  # noqa: E402
+from engine import GameEngine  # noqa: E402
+
+OPTIONS_PER_QUESTION = 4
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_MERSENNE = (1 << 61) - 1
+_PERMS = [
+    (int.from_bytes(hashlib.blake2b(b"a%d" % i, digest_size=8).digest(), "little") % _MERSENNE | 1,
+     int.from_bytes(hashlib.blake2b(b"b%d" % i, digest_size=8).digest(), "little") % _MERSENNE)
+    for i in range(NUM_PERM)
+]
+
+
+def normalize(text):
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def minhash(text, n=4):
+    text = normalize(text)
+    shingles = {text[i:i + n] for i in range(max(1, len(text) - n + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+              for s in shingles]
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMS)
+
+
+# -------- per chapter (runs in the pool) --------
+def check_question(q):
+    errors, warnings = [], []
+    if not isinstance(q, dict):
+        return ["not an object"], warnings
+
+    prompt = q.get("prompt")
+    if not isinstance(prompt, str) or not prompt.strip():
+        errors.append("missing or empty prompt")
+        prompt = ""
+
+    options = q.get("options")
+    if not isinstance(options, list) or not all(isinstance(o, str) and o.strip() for o in options):
+        errors.append("options must be a list of non-empty strings")
+        options = []
+    elif len(options) != OPTIONS_PER_QUESTION:
+        errors.append(f"{len(options)} options, the game shows {OPTIONS_PER_QUESTION}")
+    if len({normalize(o) for o in options}) != len(options):
+        errors.append("duplicate options")
+
+    ci = q.get("correct_index")
+    if not isinstance(ci, int) or isinstance(ci, bool) or not 0 <= ci < max(1, len(options)):
+        errors.append(f"correct_index {ci!r} out of range for {len(options)} options")
+        ci = None
+
+    difficulty = q.get("difficulty")
+    if difficulty is None:
+        warnings.append("no difficulty")
+    elif difficulty not in DIFFICULTIES:
+        errors.append(f"unknown difficulty {difficulty!r}")
+    xp = q.get("xp")
+    if xp is not None and (not isinstance(xp, int) or not 0 < xp < question_bank.NO_XP):
+        errors.append(f"bad xp {xp!r}")
+    tags = q.get("tags", [])
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        errors.append("tags must be a list of strings")
+    if "fact" in q and not isinstance(q["fact"], str):
+        errors.append("fact must be a string")
+
+    # the answer written out in the question
+    if ci is not None and prompt:
+        answer = normalize(options[ci])
+        if answer and re.search(rf"\b{re.escape(answer)}\b", normalize(prompt)):
+            warnings.append(f"prompt contains the answer {options[ci]!r}")
+    return errors, warnings
+
+
+def check_chapter(job):
+    source, title, questions = job
+    issues = []
+    prompts = []
+    meta = []
+    counts = {d: 0 for d in DIFFICULTIES}
+
+    for qi, q in enumerate(questions):
+        errors, warnings = check_question(q)
+        where = f"{source}: {title!r} #{qi + 1}"
+        issues.extend(("ERROR", where, e) for e in errors)
+        issues.extend(("WARN", where, w) for w in warnings)
+        prompt = q.get("prompt") if isinstance(q, dict) else None
+        if isinstance(prompt, str) and prompt.strip():
+            prompts.append((where, normalize(prompt), minhash(prompt)))
+            meta.append([question_id(prompt), q.get("difficulty"), q.get("xp", 10), q.get("tags", [])])
+        if isinstance(q, dict) and q.get("difficulty") in counts:
+            counts[q["difficulty"]] += 1
+
+    where = f"{source}: {title!r}"
+    if len(questions) < GameEngine.QUESTIONS_PER_CHAPTER:
+        issues.append(("WARN", where, f"only {len(questions)} questions, a run plays "
+                                      f"{GameEngine.QUESTIONS_PER_CHAPTER}"))
+    rated = sum(counts.values())
+    if rated:
+        missing = [d for d, n in counts.items() if not n]
+        if missing:
+            issues.append(("WARN", where, f"no {'/'.join(missing)} questions"))
+        for d, n in counts.items():
+            if n / rated > 0.6:
+                issues.append(("WARN", where, f"{n}/{rated} questions are {d}"))
+    return issues, prompts, meta, counts
+
+
+# -------- bank-wide --------
+def find_duplicates(prompts, near):
+    issues = []
+    seen = {}
+    for where, text, _sig in prompts:
+        if text in seen:
+            issues.append(("ERROR", where, f"duplicate of {seen[text]}"))
+        else:
+            seen[text] = where
+
+    # LSH: prompts sharing any band of their signature are candidates
+    buckets = {}
+    for i, (_where, _text, sig) in enumerate(prompts):
+        for b in range(BANDS):
+            buckets.setdefault((b, sig[b * ROWS:(b + 1) * ROWS]), []).append(i)
+    pairs = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pairs.add((members[x], members[y]))
+    for i, j in sorted(pairs):
+        (wi, ti, si), (wj, tj, sj) = prompts[i], prompts[j]
+        if ti == tj:
+            continue
+        similarity = sum(a == b for a, b in zip(si, sj)) / NUM_PERM
+        if similarity >= near:
+            issues.append(("WARN", wj, f"near duplicate ({similarity:.0%}) of {wi}"))
+    return issues
+
+
+# -------- sources --------
+class PackSource:
+    def __init__(self, path):
+        self.path = path
+        self.is_zip = os.path.isfile(path)
+        with self._open("manifest.json") as f:
+            self.manifest = json.load(f)
+        self.label = self.manifest.get("id", os.path.basename(path))
+
+    def _open(self, rel):
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as z:
+                return io.BytesIO(z.read(rel))
+        return open(os.path.join(self.path, rel), "rb")
+
+    def jobs(self):
+        for entry in self.manifest.get("chapters", []):
+            with self._open(entry["file"]) as f:
+                questions = json.loads(f.read().decode("utf-8-sig"))
+            yield (self.label, entry.get("title", entry["file"]), questions)
+
+    def write_meta(self, results):
+        for entry, (_issues, _prompts, meta, _counts) in zip(self.manifest.get("chapters", []), results):
+            entry["questions"] = len(meta)
+            entry["meta"] = meta
+        text = json.dumps(self.manifest, indent=2, ensure_ascii=False)
+        if not self.is_zip:
+            write_file(os.path.join(self.path, "manifest.json"), text.encode("utf-8"))
+            return
+        # rewrite the zip with the new manifest
+        tmp = self.path + ".tmp"
+        with zipfile.ZipFile(self.path) as src, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename != "manifest.json":
+                    dst.writestr(info, src.read(info.filename))
+            dst.writestr("manifest.json", text)
+        os.replace(tmp, self.path)
+
+
+def write_file(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def bank_jobs(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [("questions.json", ch.get("title", f"chapter {i + 1}"), ch.get("questions", []))
+            for i, ch in enumerate(data.get("chapters", []))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*",
+                        help="questions.json files and pack directories / zips "
+                             "(default: questions.json and everything in packs/)")
+    parser.add_argument("--near", type=float, default=0.8,
+                        help="MinHash similarity at which prompts count as near duplicates")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--write-meta", action="store_true")
+    parser.add_argument("--quiet", action="store_true", help="only print errors")
+    args = parser.parse_args()
+
+    paths = args.paths
+    if not paths:
+        paths = [os.path.join(BASE_DIR, "questions.json")]
+        packs_dir = os.path.join(BASE_DIR, "packs")
+        if os.path.isdir(packs_dir):
+            paths += [os.path.join(packs_dir, n) for n in sorted(os.listdir(packs_dir))
+                      if os.path.isdir(os.path.join(packs_dir, n)) or n.endswith(".zip")]
+
+    sources = []   # (path, PackSource or None, jobs)
+    for path in paths:
+        if path.endswith(".json"):
+            sources.append((path, None, bank_jobs(path)))
+        else:
+            pack = PackSource(path)
+            sources.append((path, pack, list(pack.jobs())))
+
+    jobs = [job for _path, _pack, source_jobs in sources for job in source_jobs]
+    if args.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(check_chapter, jobs))
+    else:
+        results = [check_chapter(job) for job in jobs]
+
+    issues = [issue for r in results for issue in r[0]]
+    issues += find_duplicates([p for r in results for p in r[1]], args.near)
+
+    errors = sum(1 for level, _w, _m in issues if level == "ERROR")
+    for level, where, message in issues:
+        if level == "ERROR" or not args.quiet:
+            print(f"{level:5} {where}: {message}")
+    questions = sum(len(r[2]) for r in results)
+    print(f"{len(jobs)} chapters, {questions} questions: {errors} errors, {len(issues) - errors} warnings")
+
+    if args.write_meta:
+        if errors:
+            print("not writing metadata while there are errors", file=sys.stderr)
+        else:
+            at = 0
+            for path, pack, source_jobs in sources:
+                chunk = results[at:at + len(source_jobs)]
+                at += len(source_jobs)
+                if pack is None:
+                    bank_path = os.path.splitext(path)[0] + ".qbank"
+                    question_bank.compile_bank(path, bank_path)
+                    print(f"compiled {bank_path}")
+                else:
+                    pack.write_meta(chunk)
+                    print(f"wrote metadata for {pack.label}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
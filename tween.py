@@ -0,0 +1,169 @@
+"""Tweens for the game's small UI effects, all driven by one Clock callback.
+
+Every kivy Animation schedules its own per-frame callback, and starting a
+new one on a property that is already animating stacks a second writer on
+it. Here a tween is one numeric property of one widget, stored as a row of
+parallel arrays (start value, end value, start time, duration) that a
+single per-frame callback advances; the callback is only scheduled while
+something is moving. Starting a tween on a (widget, property) that already
+has one retargets that row from the current value instead of adding
+another, so a burst of effects costs the same per frame as one per
+property.
+
+A tween can be a chain of segments (e.g. a shake: left, right, back) and
+calls on_complete(widget) when its last segment ends.
+"""
+from array import array
+
+from kivy.animation import AnimationTransition
+from kivy.clock import Clock
+
+
+class TweenEngine:
+    def __init__(self):
+        self._slots = {}            # (widget, prop) -> row
+        self._widgets = []
+        self._props = []
+        self._from = array("d")
+        self._to = array("d")
+        self._start = array("d")
+        self._duration = array("d")
+        self._easing = []
+        self._queued = []           # per row: remaining (to, duration, easing) segments
+        self._on_complete = []
+        self._event = None
+        self.retargeted = 0
+        # called when tweens start running after none were (frame governor)
+        self.on_running = None
+
+    def __len__(self):
+        return len(self._widgets)
+
+    # -------- starting --------
+    def animate(self, widget, prop, to, duration, transition="linear", on_complete=None):
+        return self.chain(widget, prop, [(to, duration, transition)], on_complete)
+
+    def chain(self, widget, prop, segments, on_complete=None):
+        """Run `segments` ([(to, duration, transition), ...]) one after the
+        other on widget.prop, replacing any tween already on it."""
+        now = Clock.get_time()
+        segments = [(float(to), duration, self._transition(t)) for to, duration, t in segments]
+        to, duration, easing = segments[0]
+        key = (widget, prop)
+        row = self._slots.get(key)
+        if row is None:
+            row = len(self._widgets)
+            self._slots[key] = row
+            self._widgets.append(widget)
+            self._props.append(prop)
+            self._from.append(0.0)
+            self._to.append(0.0)
+            self._start.append(0.0)
+            self._duration.append(0.0)
+            self._easing.append(None)
+            self._queued.append(None)
+            self._on_complete.append(None)
+        else:
+            self.retargeted += 1
+        self._from[row] = float(getattr(widget, prop))
+        self._to[row] = to
+        self._start[row] = now
+        self._duration[row] = duration
+        self._easing[row] = easing
+        self._queued[row] = segments[1:]
+        self._on_complete[row] = on_complete
+
+        if self._event is None:
+            self._event = Clock.schedule_interval(self._tick, 0)
+            if self.on_running is not None:
+                self.on_running()
+
+    @staticmethod
+    def _transition(t):
+        return getattr(AnimationTransition, t) if isinstance(t, str) else t
+
+    # -------- queries --------
+    def is_running(self, widget, prop):
+        return (widget, prop) in self._slots
+
+    def final_value(self, widget, prop):
+        """Where widget.prop ends up once its tween finishes (its current
+        value when it has none), for effects relative to a resting value."""
+        row = self._slots.get((widget, prop))
+        if row is None:
+            return getattr(widget, prop)
+        queued = self._queued[row]
+        return queued[-1][0] if queued else self._to[row]
+
+    # -------- stopping --------
+    def cancel(self, widget, prop=None, finish=False):
+        """Stop the tweens on `widget` (one property or all), leaving the
+        property where it is or, with finish, at its final value."""
+        props = [prop] if prop is not None else [
+            p for w, p in self._slots if w is widget
+        ]
+        for p in props:
+            row = self._slots.get((widget, p))
+            if row is not None:
+                if finish:
+                    setattr(widget, p, self.final_value(widget, p))
+                self._remove(row)
+
+    def _remove(self, row):
+        # move the last row into the hole; rows are unordered
+        last = len(self._widgets) - 1
+        del self._slots[(self._widgets[row], self._props[row])]
+        if row != last:
+            self._widgets[row] = self._widgets[last]
+            self._props[row] = self._props[last]
+            self._from[row] = self._from[last]
+            self._to[row] = self._to[last]
+            self._start[row] = self._start[last]
+            self._duration[row] = self._duration[last]
+            self._easing[row] = self._easing[last]
+            self._queued[row] = self._queued[last]
+            self._on_complete[row] = self._on_complete[last]
+            self._slots[(self._widgets[row], self._props[row])] = row
+        self._widgets.pop()
+        self._props.pop()
+        self._from.pop()
+        self._to.pop()
+        self._start.pop()
+        self._duration.pop()
+        self._easing.pop()
+        self._queued.pop()
+        self._on_complete.pop()
+
+    # -------- the one frame callback --------
+    def _tick(self, _dt):
+        now = Clock.get_time()
+        finished = []
+        for row in range(len(self._widgets) - 1, -1, -1):
+            duration = self._duration[row]
+            progress = (now - self._start[row]) / duration if duration > 0 else 1.0
+            if progress >= 1.0:
+                setattr(self._widgets[row], self._props[row], self._to[row])
+                queued = self._queued[row]
+                if queued:
+                    # next segment starts where this one ended
+                    to, duration, easing = queued.pop(0)
+                    self._from[row] = self._to[row]
+                    self._to[row] = to
+                    self._start[row] = now
+                    self._duration[row] = duration
+                    self._easing[row] = easing
+                    continue
+                finished.append((self._widgets[row], self._on_complete[row]))
+                self._remove(row)
+                continue
+            start = self._from[row]
+            value = start + (self._to[row] - start) * self._easing[row](progress)
+            setattr(self._widgets[row], self._props[row], value)
+
+        if not self._widgets:
+            self._event.cancel()
+            self._event = None
+        # callbacks last: they may start new tweens
+        for widget, on_complete in finished:
+            if on_complete is not None:
+                on_complete(widget)